@@ -15,6 +15,13 @@ class Settings(BaseSettings):
     OLLAMA_HOST: str = "http://ollama:11434"
     VALKEY_HOST: str = "valkey"
     VALKEY_PORT: int = 6379
+    # Upper bound on a single chat completion for user-facing replies
+    LLM_TIMEOUT_SECONDS: float = 60.0
+
+    # WhatsApp Cloud API
+    WHATSAPP_API_VERSION: str = "v22.0"
+    PHONE_NUMBER_ID: int = 0
+    WHATSAPP_ACCESS_TOKEN: str = ""
 
     # Load from .env file
     model_config = SettingsConfigDict(
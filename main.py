@@ -25,8 +25,10 @@ from routers.cameras import (
     BATCH_SIZE,
     capture_camera_frames,
     detection_processor,
+    frame_ticker,
 )
 from services.nightly_services import nightly_report_task
+from utils.whatsapp.whatsapp import async_http_client as whatsapp_http_client
 
 # =============================================================================
 # LIFESPAN MANAGER
@@ -35,6 +37,11 @@ from services.nightly_services import nightly_report_task
 async def lifespan(app: FastAPI):
     """Manages application-wide startup and shutdown events."""
     logger.info("Application starting up...")
+    # WhatsApp replies and reports are disabled, not fatal, when unconfigured
+    if not settings.WHATSAPP_ACCESS_TOKEN:
+        logger.warning("WHATSAPP_ACCESS_TOKEN is not set; WhatsApp sends will fail.")
+    if not settings.PHONE_NUMBER_ID:
+        logger.warning("PHONE_NUMBER_ID is not set; WhatsApp sends will fail.")
 
     # Initialize and assign the process pool for YOLO tasks
     # process_pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
@@ -48,6 +55,7 @@ async def lifespan(app: FastAPI):
     # Start the nightly reporting service
     asyncio.create_task(nightly_report_task())
     logger.info("Nightly report background task started.")
+    asyncio.create_task(frame_ticker())
     for i in range(0, len(CAMERAS), BATCH_SIZE):
         batch_cameras = dict(list(CAMERAS.items())[i : i + BATCH_SIZE])
         for cam_id, config in batch_cameras.items():
@@ -60,9 +68,12 @@ async def lifespan(app: FastAPI):
     logger.info("Application shutting down...")
     cameras.stream_active = False
     logger.info("Signaled all camera streams to stop.")
+    # Drop queued capture work; don't wait on a thread stuck in cap.read()
+    cameras.CAPTURE_POOL.shutdown(wait=False, cancel_futures=True)
     # Clean up the httpx client
     await cameras.async_http_client.aclose()
-    logger.info("HTTPX client has been closed.")
+    await whatsapp_http_client.aclose()
+    logger.info("HTTPX clients have been closed.")
     logger.info("Application shutdown complete.")
 
 
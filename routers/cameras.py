@@ -2,10 +2,12 @@ import asyncio
 import multiprocessing as mp
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from threading import Lock
-from typing import Optional, Any
+from typing import Optional
 
 import cv2
 import httpx
@@ -15,7 +17,6 @@ from fastapi import APIRouter, Response
 from fastapi.responses import HTMLResponse, StreamingResponse
 from loguru import logger
 from utils.db.base import CameraTraffic, bulk_insert_query
-from utils.holidays import holiday_checker
 
 # Configure logging
 logger.add("./logs/multi-camera.log", rotation="1 week")
@@ -29,6 +30,8 @@ NVR_IP_ADDRESS=os.getenv("NVR_IP_ADDRESS")
 PORT = 554
 VIDEO_FPS = 30
 DETECTION_INTERVAL = 1.0  # Process detection every 1 second
+MAX_DETECTION_INTERVAL = 10.0  # Detect at least this often on a static scene
+MOTION_THRESHOLD = 4.0  # Mean grey-level change that counts as movement
 BATCH_SIZE = 4  # Process cameras in batches
 MAX_WORKERS = min(8, mp.cpu_count())  # Limit workers based on CPU cores
 query_batch_size = 30
@@ -214,10 +217,39 @@ CAMERAS = {
     },
 }
  
+# Blocking OpenCV connect/read/encode calls run here, one thread per camera,
+# so a stalled RTSP read never blocks the event loop
+CAPTURE_POOL = ThreadPoolExecutor(
+    max_workers=len(CAMERAS), thread_name_prefix="capture"
+)
+# Parallelism comes from the per-camera threads; keep OpenCV from spawning its own
+cv2.setNumThreads(1)
+
+FRAME_PART_HEADER = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+FRAME_PART_TRAILER = b"\r\n"
+
 detection_queue = asyncio.Queue(maxsize=100)
 stream_active = True
+# Latest multipart chunk per camera, built once per frame and shared by all viewers
 current_frames: dict[int, Optional[bytes]] = {channel: None for channel in CAMERAS}
-frame_locks: dict[int, Any] = {channel: asyncio.Lock() for channel in CAMERAS}
+# Set whenever a camera publishes a new chunk, waking its viewers
+frame_events: dict[int, asyncio.Event] = {
+    channel: asyncio.Event() for channel in CAMERAS
+}
+# Open /video streams per camera; display frames are only encoded while watched
+viewer_counts: dict[int, int] = {channel: 0 for channel in CAMERAS}
+# Shared pacing tick for all capture loops: one timer instead of one per camera
+frame_tick = asyncio.Event()
+
+async def frame_ticker():
+    """Background task that wakes every capture loop once per video frame"""
+    while stream_active:
+        await asyncio.sleep(1.0 / VIDEO_FPS)
+        frame_tick.set()
+        frame_tick.clear()
+    # Release any capture loop still waiting so it can see the shutdown
+    frame_tick.set()
+
 
 async def detection_processor():
     """Background task to process detection queue and send to database"""
@@ -270,6 +302,59 @@ def generate_rtsp_url(camera: dict) -> list[str]:
     ]
 
 
+def open_capture(url: str) -> cv2.VideoCapture:
+    """Open an RTSP stream, using FFmpeg hardware decoding (GPU/VA-API) if available"""
+    return cv2.VideoCapture(
+        url,
+        cv2.CAP_FFMPEG,
+        [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+    )
+
+
+def find_working_rtsp_url(
+    cam_id: int, urls: list[str]
+) -> tuple[Optional[str], Optional[cv2.VideoCapture]]:
+    """Return the first URL that opens and yields a frame, with its capture open"""
+    for url in urls:
+        try:
+            cap_test = open_capture(url)
+            if cap_test.isOpened():
+                success, _ = cap_test.read()
+                if success:
+                    logger.success(f"Cam {cam_id}: Found working RTSP URL.")
+                    return url, cap_test
+                logger.warning(f"Cam {cam_id}: URL opens but cannot read frames.")
+            cap_test.release()
+        except Exception as e:
+            logger.error(f"Cam {cam_id}: Exception during URL test: {e}")
+    return None, None
+
+
+def read_frame(
+    cap: cv2.VideoCapture, display_frame: np.ndarray, encode: bool
+) -> tuple[Optional[np.ndarray], Optional[bytes]]:
+    """Read the next frame and, if asked, its multipart display chunk"""
+    success, frame = cap.read()
+    if not success or frame is None:
+        return None, None
+    if not encode:
+        return frame, None
+
+    # Streams already at display size are encoded without the extra resize pass
+    if frame.shape == display_frame.shape:
+        display_frame = frame
+    else:
+        cv2.resize(frame, (640, 480), dst=display_frame)
+    _, buffer = cv2.imencode(".jpg", display_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+    return frame, b"".join((FRAME_PART_HEADER, buffer, FRAME_PART_TRAILER))
+
+
+def motion_thumbnail(frame: np.ndarray) -> np.ndarray:
+    """Small greyscale copy of a frame for cheap scene-change checks"""
+    small = cv2.resize(frame, (80, 45), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+
 async def get_detections_from_service(frame: np.ndarray) -> Optional[dict]:
     """Encodes a frame and sends it to the YOLO service for detection."""
     try:
@@ -312,27 +397,21 @@ async def capture_camera_frames(cam_id: int, camera_config: dict):
     rtsp_urls_to_try = generate_rtsp_url(camera_config)
     working_url = None
     last_detection_time = 0
+    last_check_time = 0
+    last_thumbnail = None
+    # Reused resize target for the 640x480 display stream
+    display_frame = np.empty((480, 640, 3), dtype=np.uint8)
+
+    loop = asyncio.get_running_loop()
 
     while stream_active:
+        cap = None
         # --- Stage 1: Find a working URL (inspired by find_working_rtsp_url) ---
+        # The probe's capture is kept for streaming, so a new camera connects once
         if not working_url:
-            for url in rtsp_urls_to_try:
-                try:
-                    cap_test = cv2.VideoCapture(url, cv2.CAP_FFMPEG)
-                    if cap_test.isOpened():
-                        success, _ = cap_test.read()
-                        if success:
-                            logger.success(f"Cam {cam_id}: Found working RTSP URL.")
-                            working_url = url
-                            cap_test.release()
-                            break  # Exit the URL testing loop
-                        else:
-                            logger.warning(
-                                f"Cam {cam_id}: URL opens but cannot read frames."
-                            )
-                    cap_test.release()
-                except Exception as e:
-                    logger.error(f"Cam {cam_id}: Exception during URL test: {e}")
+            working_url, cap = await loop.run_in_executor(
+                CAPTURE_POOL, find_working_rtsp_url, cam_id, rtsp_urls_to_try
+            )
 
             if not working_url:
                 logger.error(
@@ -342,7 +421,9 @@ async def capture_camera_frames(cam_id: int, camera_config: dict):
                 continue
 
         # --- Stage 2: Main Capture Loop (inspired by capture_frames) ---
-        cap = cv2.VideoCapture(working_url)
+        # Reconnects go straight to the URL that worked before
+        if cap is None:
+            cap = await loop.run_in_executor(CAPTURE_POOL, open_capture, working_url)
         if not cap.isOpened():
             logger.error(f"Cam {cam_id}: Failed to reopen working URL. Resetting...")
             working_url = None
@@ -354,9 +435,14 @@ async def capture_camera_frames(cam_id: int, camera_config: dict):
         max_consecutive_failures = 60  # e.g., 2 seconds of dropped frames at 30fps
 
         while stream_active:
-            success, frame = cap.read()
+            # 1. Read, and encode for web streaming unless nobody is watching
+            # (the first frame is always kept so the camera reports as active)
+            encode = bool(viewer_counts[cam_id]) or current_frames[cam_id] is None
+            frame, chunk = await loop.run_in_executor(
+                CAPTURE_POOL, read_frame, cap, display_frame, encode
+            )
 
-            if not success or frame is None:
+            if frame is None:
                 consecutive_failures += 1
                 if consecutive_failures > max_consecutive_failures:
                     logger.warning(
@@ -367,26 +453,36 @@ async def capture_camera_frames(cam_id: int, camera_config: dict):
                 continue
 
             consecutive_failures = 0  # Reset on successful read
-            # 1. Encode frame for web streaming
-            display_frame = cv2.resize(frame, (640, 480))
-            _, buffer = cv2.imencode(
-                ".jpg", display_frame, [cv2.IMWRITE_JPEG_QUALITY, 70]
-            )
-
-            # Use an asyncio.Lock for safe async access to the shared dictionary
-            async with frame_locks[cam_id]:
-                current_frames[cam_id] = buffer.tobytes()
+            if chunk is not None:
+                # Single writer publishing an immutable chunk, so no lock is needed
+                current_frames[cam_id] = chunk
+                frame_events[cam_id].set()
+                frame_events[cam_id].clear()
 
-            # 2. Send frame for YOLO detection at intervals
+            # 2. Send frame for YOLO detection at intervals, skipping static scenes
             current_time = time.time()
-            if current_time - last_detection_time >= DETECTION_INTERVAL:
-                last_detection_time = current_time
-                detection_result = await get_detections_from_service(frame)
-                logger.info(detection_result)
+            if current_time - last_check_time >= DETECTION_INTERVAL:
+                last_check_time = current_time
+                thumbnail = await loop.run_in_executor(
+                    CAPTURE_POOL, motion_thumbnail, frame
+                )
+                scene_changed = (
+                    last_thumbnail is None
+                    or cv2.absdiff(thumbnail, last_thumbnail).mean() > MOTION_THRESHOLD
+                )
+                last_thumbnail = thumbnail
 
-            await asyncio.sleep(1.0 / VIDEO_FPS)  # Control the loop speed
+                if (
+                    scene_changed
+                    or current_time - last_detection_time >= MAX_DETECTION_INTERVAL
+                ):
+                    last_detection_time = current_time
+                    detection_result = await get_detections_from_service(frame)
+                    logger.info(detection_result)
 
-        cap.release()
+            await frame_tick.wait()  # Control the loop speed
+
+        await loop.run_in_executor(CAPTURE_POOL, cap.release)
         logger.info(f"Cam {cam_id}: Capture released. Will attempt to reconnect.")
         await asyncio.sleep(5)
 
@@ -401,34 +497,44 @@ async def handle_detection_result(future):
         logger.error(f"Error handling detection result: {str(e)}")
 
 
+@lru_cache(maxsize=None)
+def placeholder_frame(cam_id: int) -> bytes:
+    """Multipart chunk shown while a camera has no frame, encoded once per camera"""
+    placeholder = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(
+        placeholder,
+        f"Camera {cam_id} Offline",
+        (50, 240),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        1,
+        (255, 255, 255),
+        2,
+    )
+    _, buffer = cv2.imencode(".jpg", placeholder)
+    return b"".join((FRAME_PART_HEADER, buffer, FRAME_PART_TRAILER))
+
+
 async def generate_frames(cam_id: int):
     """Generator function for streaming frames"""
-    while True:
-        async with frame_locks[cam_id]:
+    viewer_counts[cam_id] += 1
+    try:
+        while True:
             frame = current_frames[cam_id]
 
-        if frame:
-            yield (b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + frame + b"\r\n")
-        else:
-            # Send placeholder image if no frame available
-            placeholder = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.putText(
-                placeholder,
-                f"Camera {cam_id} Offline",
-                (50, 240),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1,
-                (255, 255, 255),
-                2,
-            )
-            _, buffer = cv2.imencode(".jpg", placeholder)
-            yield (
-                b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
-                + buffer.tobytes()
-                + b"\r\n"
-            )
+            if frame:
+                yield frame
+            else:
+                # Send placeholder image if no frame available
+                yield placeholder_frame(cam_id)
 
-        await asyncio.sleep(1.0 / VIDEO_FPS)
+            # Wait for the next published frame, resending at least once a
+            # second so idle or offline streams stay alive
+            try:
+                await asyncio.wait_for(frame_events[cam_id].wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        viewer_counts[cam_id] -= 1
 
 
 router = APIRouter(
@@ -438,18 +544,19 @@ router = APIRouter(
 )
 
 
-@router.get("/home", response_class=HTMLResponse)
-async def index():
-    """Home page with all camera feeds"""
+@lru_cache(maxsize=1)
+def render_index_html() -> str:
+    """Home page markup; CAMERAS is static, so it is rendered once"""
     camera_html = "".join(
         f"""
         <div class="camera">
             <h3>Camera {cam_id} - {config["name"]}</h3>
             <div class="camera-info">
                 <span class="location">Location: {config["location"]}</span>
-                <span class="ip">IP: {config["ip"]}</span>
+                <span class="ip">Channel: {config["channel"]}</span>
             </div>
-            <img src="/video/{cam_id}" alt="Camera {cam_id} Stream" loading="lazy">
+            <img src="/cameras/video/{cam_id}" alt="Camera {cam_id} Stream"
+                 loading="lazy">
         </div>
         """
         for cam_id, config in CAMERAS.items()
@@ -563,7 +670,7 @@ async def index():
         <script>
             // Auto-refresh detection status
             setInterval(() => {{
-                fetch('/api/status')
+                fetch('/cameras/api/status')
                     .then(response => response.json())
                     .then(data => {{
                         console.log('System status:', data);
@@ -576,6 +683,12 @@ async def index():
     """
 
 
+@router.get("/home", response_class=HTMLResponse)
+async def index():
+    """Home page with all camera feeds"""
+    return render_index_html()
+
+
 @router.get("/video/{cam_id}")
 async def video_feed(cam_id: int):
     """Video streaming endpoint for individual cameras"""
@@ -12,8 +12,8 @@ import httpx
 from loguru import logger
 from schemas import GenerationRequest, LlmRequestPayload
 from services.analysis_service import gen_response
-from utils.text_processing import convert_llm_output_to_readable
-from utils.whatsapp.whatsapp import whatsapp_messenger
+from services.reply_service import generate_reply
+from utils.whatsapp.whatsapp import whatsapp_messenger_async
 
 # Add logging path
 logger.add("./logs/webhooks.log", rotation="1 week")
@@ -30,7 +30,6 @@ VERIFY_TOKEN = os.getenv("WHATSAPP_VERIFY_TOKEN")
 with open(file="/app/secrets/whatsapp_secrets.txt", mode="r") as f:
     APP_SECRET = f.read().strip()
 
-
 def verify_signature(payload: bytes, signature: str) -> bool:
     """Verify the X-Hub-Signature-256 header matches the payload signature."""
     if not APP_SECRET:
@@ -53,28 +52,19 @@ async def process_message_in_background(
     """This function runs in the background to process and respond to messages."""
     logger.info(f"Background task started for user {user_number}.")
     try:
-
-        llm_messages=[{"role": "user","content":user_message }]
-        llm_response = await gen_response(messages=llm_messages)
-        logger.info(llm_response)
-        if not llm_response or "message" not in llm_response:
-            logger.error(f"Received invalid or None response from LLM pipeline for user {user_number}.")
+        cleaned_response = await generate_reply(user_message, user_number, gen_response)
+        if cleaned_response is None:
             # Send a generic error message
-            whatsapp_messenger(
+            await whatsapp_messenger_async(
                 llm_text_output="I'm sorry, I'm having trouble processing your request right now. Please try again in a moment.",
                 recipient_number=user_number
             )
             return
-        content: str = llm_response.get("message", {}).get("content", "")
-        if not content:
-             logger.warning(f"LLM returned empty content for user {user_number}. Sending fallback.")
-             content = "I'm not sure how to respond to that. Could you please rephrase your request?"
-        cleaned_response = convert_llm_output_to_readable(content)
-        whatsapp_messenger(
+        await whatsapp_messenger_async(
             llm_text_output=cleaned_response, recipient_number=user_number
         )
         logger.success(f"Response {cleaned_response} sent to {user_number}.")
-    except ValueError as e:
+    except Exception as e:
         logger.error(f"Background task failed for {user_number}: {e}", exc_info=True)
 
 
@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import asyncio
 import json
 from datetime import date, datetime, timezone
 
@@ -15,6 +16,7 @@ from utils.app_tools import (
     create_recommendations,
 )
 from utils.report_format import ModernPDFGenerator
+from utils.text_processing import clean_text_remove_think_tags
 from prompts import PROMPT_REPORT_ANALYST
 import os
 pdf_generator = ModernPDFGenerator()
@@ -110,9 +112,11 @@ async def process_analysis_in_background(
                 "include_predictions": request.include_predictions,
             },
         }
-        # Generate PDF
-        output_file = pdf_generator.generate_pdf(
-            analysis_result, f"./utils/reports/Traffic_report_{today}.pdf"
+        # Generate PDF off the event loop; doc.build is CPU-bound
+        output_file = await asyncio.to_thread(
+            pdf_generator.generate_pdf,
+            analysis_result,
+            f"./utils/reports/Traffic_report_{today}.pdf",
         )
         final_status = {"status": "completed", "result": analysis_result}
         valkey_client.set(
@@ -1,23 +1,17 @@
 # services/nightly_report_service.py
-from pytz import _UTCclass
-
-
-from pytz.tzinfo import DstTzInfo, StaticTzInfo
-
-
 import asyncio
 import os
 import json
 from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
 from loguru import logger
 
 from config import settings
-from utils.whatsapp.whatsapp import whatsapp_messenger
-import pytz
+from utils.whatsapp.whatsapp import whatsapp_messenger_async
 
 # Add a logger for this service
 logger.add("logs/nightly_reporter.log", rotation="1 week", level="INFO")
-nbo_time: _UTCclass | StaticTzInfo | DstTzInfo=pytz.timezone("Africa/Nairobi") 
+nbo_time = ZoneInfo("Africa/Nairobi")
 def count_nightly_detections() -> int:
     """
     Reads detection logs and counts human detections between 10 PM of the previous day
@@ -102,7 +96,7 @@ async def nightly_report_task():
                 f"This is an automated message from the Lantern Security System."
             )
 
-            whatsapp_messenger(
+            await whatsapp_messenger_async(
                 llm_text_output=report_message,
                 recipient_number=settings.NIGHTLY_REPORT_RECIPIENT_NUMBER
             )
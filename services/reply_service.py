@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Cached, single-flight LLM replies to incoming WhatsApp messages."""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Optional
+import weakref
+
+from cachetools import TTLCache
+from loguru import logger
+
+from config import settings
+from utils.text_processing import convert_llm_output_to_readable
+
+# Recent LLM replies keyed by the SHA-256 of the incoming message
+_REPLY_CACHE: TTLCache = TTLCache(maxsize=500, ttl=3600)
+# Per-message locks, dropped once no request is waiting on them
+_REPLY_LOCKS: "weakref.WeakValueDictionary[bytes, asyncio.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+async def generate_reply(
+    user_message: str, user_number: str, llm: Callable[..., Awaitable[Any]]
+) -> Optional[str]:
+    """Ask the LLM for a reply, reusing a recent answer to the same message.
+
+    llm is the chat call, e.g. services.analysis_service.gen_response.
+    """
+    cache_key = hashlib.sha256(user_message.encode("utf-8")).digest()
+    # Single-flight: identical concurrent messages wait for one LLM call
+    lock = _REPLY_LOCKS.setdefault(cache_key, asyncio.Lock())
+    async with lock:
+        cached_reply = _REPLY_CACHE.get(cache_key)
+        if cached_reply is not None:
+            logger.info(f"Serving cached reply for user {user_number}.")
+            return cached_reply
+
+        llm_messages = [{"role": "user", "content": user_message}]
+        try:
+            llm_response = await asyncio.wait_for(
+                llm(messages=llm_messages),
+                timeout=settings.LLM_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"LLM response timed out for user {user_number}.")
+            return None
+        logger.info(llm_response)
+        if not llm_response or "message" not in llm_response:
+            logger.error(
+                f"Received invalid or None response from LLM pipeline for user "
+                f"{user_number}."
+            )
+            return None
+        content: str = llm_response.get("message", {}).get("content", "")
+        if not content:
+            logger.warning(
+                f"LLM returned empty content for user {user_number}. Sending fallback."
+            )
+            return (
+                "I'm not sure how to respond to that. "
+                "Could you please rephrase your request?"
+            )
+        cleaned_response = convert_llm_output_to_readable(content)
+        _REPLY_CACHE[cache_key] = cleaned_response
+        return cleaned_response
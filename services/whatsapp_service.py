@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 """Handle whats app chatbot interactions."""
+import asyncio
 import json
 from datetime import datetime, timezone
 from loguru import logger
-from ollama import AsyncClient
 
 from config import settings
 from utils.whatsapp.whatsapp import send_whatsapp_message
@@ -42,12 +42,16 @@ async def handle_incoming_message(payload: dict):
             {"role": "user", "content": prompt_text},
         ]
 
-        # TODO: get the ollama_client via dependency injection in a real-world scenario,
-
-        ollama_client = AsyncClient(host=settings.OLLAMA_HOST)
-        llm_response = await ollama_client.chat(
-            model=settings.LLM_MODEL_ID, messages=messages
-        )
+        # Reuse the shared client so its HTTP connection pool stays warm
+        ollama_client = get_ollama_client()
+        try:
+            llm_response = await asyncio.wait_for(
+                ollama_client.chat(model=settings.LLM_MODEL_ID, messages=messages),
+                timeout=settings.LLM_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"LLM response timed out for {sender_id}.")
+            llm_response = {}
         response_text = llm_response.get("message", {}).get(
             "content", "Sorry, I encountered an error and cannot respond right now."
         )
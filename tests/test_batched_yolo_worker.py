@@ -0,0 +1,146 @@
+import asyncio
+import threading
+
+import pytest
+
+from yolo_service.batching import BatchedYoloWorker
+
+PREDICT_ARGS = {"conf": 0.6, "verbose": False}
+
+
+class FakeModel:
+    """Stands in for YOLO: echoes each frame back and records every predict call."""
+
+    def __init__(self, error=None, missing_results=0, release=None):
+        self.calls = []
+        self.error = error
+        self.missing_results = missing_results
+        self.release = release
+
+    def predict(self, frames, **kwargs):
+        self.calls.append((list(frames), kwargs))
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        results = [f"det-{frame}" for frame in frames]
+        return results[: len(results) - self.missing_results]
+
+
+async def run_with_worker(model, scenario, max_batch=16, window=0.05):
+    """Run a scenario against a started worker, stopping it afterwards."""
+    worker = BatchedYoloWorker(model, PREDICT_ARGS, max_batch=max_batch, window=window)
+    worker.start()
+    try:
+        return await scenario(worker)
+    finally:
+        await worker.stop()
+
+
+async def wait_for_predict(model):
+    """Yield to the loop until the worker has handed a batch to the model."""
+    while not model.calls:
+        await asyncio.sleep(0.001)
+
+
+def test_results_are_matched_to_their_requests():
+    model = FakeModel()
+
+    async def scenario(worker):
+        return await asyncio.gather(*(worker.submit(i) for i in range(5)))
+
+    results = asyncio.run(run_with_worker(model, scenario))
+
+    assert results == [f"det-{i}" for i in range(5)]
+    assert model.calls == [([0, 1, 2, 3, 4], PREDICT_ARGS)]
+
+
+def test_batches_are_capped_at_max_batch():
+    model = FakeModel()
+
+    async def scenario(worker):
+        return await asyncio.gather(*(worker.submit(i) for i in range(7)))
+
+    results = asyncio.run(run_with_worker(model, scenario, max_batch=3))
+
+    assert results == [f"det-{i}" for i in range(7)]
+    assert [frames for frames, _ in model.calls] == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_frames_within_the_window_share_a_batch():
+    model = FakeModel()
+
+    async def scenario(worker):
+        first = asyncio.create_task(worker.submit("a"))
+        await asyncio.sleep(0.02)
+        second = asyncio.create_task(worker.submit("b"))
+        await asyncio.gather(first, second)
+        # Once the window has closed, a new frame starts its own batch
+        await worker.submit("c")
+
+    asyncio.run(run_with_worker(model, scenario, window=0.2))
+
+    assert [frames for frames, _ in model.calls] == [["a", "b"], ["c"]]
+
+
+def test_predict_errors_reach_every_request_in_the_batch():
+    model = FakeModel(error=ValueError("boom"))
+
+    async def scenario(worker):
+        outcomes = await asyncio.gather(
+            *(worker.submit(i) for i in range(3)), return_exceptions=True
+        )
+        # The worker keeps serving after a failed batch
+        model.error = None
+        return outcomes, await worker.submit(3)
+
+    outcomes, result = asyncio.run(run_with_worker(model, scenario))
+
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert result == "det-3"
+
+
+def test_missing_results_fail_the_whole_batch():
+    model = FakeModel(missing_results=1)
+
+    async def scenario(worker):
+        return await asyncio.gather(
+            *(worker.submit(i) for i in range(3)), return_exceptions=True
+        )
+
+    outcomes = asyncio.run(run_with_worker(model, scenario))
+
+    assert len(outcomes) == 3
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+
+def test_cancelled_requests_do_not_break_the_batch():
+    release = threading.Event()
+    model = FakeModel(release=release)
+
+    async def scenario(worker):
+        cancelled = asyncio.create_task(worker.submit("a"))
+        kept = asyncio.create_task(worker.submit("b"))
+        await wait_for_predict(model)
+        cancelled.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await kept, await worker.submit("c")
+
+    kept_result, next_result = asyncio.run(run_with_worker(model, scenario))
+
+    assert kept_result == "det-b"
+    assert next_result == "det-c"
+
+
+def test_stop_cancels_frames_still_queued():
+    async def scenario():
+        worker = BatchedYoloWorker(FakeModel(), PREDICT_ARGS, max_batch=16, window=0.05)
+        pending = asyncio.create_task(worker.submit("a"))
+        await asyncio.sleep(0)
+        await worker.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+
+    asyncio.run(scenario())
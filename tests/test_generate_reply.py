@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from services import reply_service
+from utils.text_processing import convert_llm_output_to_readable
+
+MESSAGE = "What time does the lobby open?"
+LLM_CONTENT = "The lobby opens at **7am** on weekdays."
+
+
+class FakeLLM:
+    """Stands in for gen_response, counting calls and optionally stalling."""
+
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"message": {"role": "assistant", "content": LLM_CONTENT}}
+
+
+@pytest.fixture(autouse=True)
+def empty_reply_cache():
+    reply_service._REPLY_CACHE.clear()
+    yield
+    reply_service._REPLY_CACHE.clear()
+
+
+def test_repeated_message_is_served_from_cache():
+    llm = FakeLLM()
+
+    async def scenario():
+        first = await reply_service.generate_reply(MESSAGE, "254700000001", llm)
+        second = await reply_service.generate_reply(MESSAGE, "254700000002", llm)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == second == convert_llm_output_to_readable(LLM_CONTENT)
+    assert llm.calls == 1
+
+
+def test_concurrent_identical_messages_share_one_llm_call():
+    llm = FakeLLM(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(
+                reply_service.generate_reply(MESSAGE, f"25470000000{i}", llm)
+                for i in range(3)
+            )
+        )
+
+    replies = asyncio.run(scenario())
+
+    assert replies == [convert_llm_output_to_readable(LLM_CONTENT)] * 3
+    assert llm.calls == 1
+
+
+def test_llm_timeout_returns_none_and_is_not_cached(monkeypatch):
+    monkeypatch.setattr(reply_service.settings, "LLM_TIMEOUT_SECONDS", 0.01)
+    stalled = FakeLLM(delay=1.0)
+
+    reply = asyncio.run(reply_service.generate_reply(MESSAGE, "254700000001", stalled))
+    assert reply is None
+
+    # A later attempt goes back to the LLM rather than replaying the failure
+    llm = FakeLLM()
+    reply = asyncio.run(reply_service.generate_reply(MESSAGE, "254700000001", llm))
+
+    assert reply == convert_llm_output_to_readable(LLM_CONTENT)
+    assert llm.calls == 1
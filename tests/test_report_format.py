@@ -0,0 +1,91 @@
+import pytest
+from reportlab.platypus import Spacer
+
+from utils.report_format import ModernPDFGenerator, format_dynamic_text_to_pdf
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return ModernPDFGenerator()
+
+
+def describe(elements):
+    """Reduce flowables to (style name, text) and ("Spacer", height) tuples."""
+    return [
+        (
+            ("Spacer", element.height)
+            if isinstance(element, Spacer)
+            else (element.style.name, element.text)
+        )
+        for element in elements
+    ]
+
+
+def test_body_and_bullet_runs_become_one_paragraph_each(generator):
+    text = (
+        "Traffic was steady\nacross the day\n- Lobby busiest\n* Peak at **noon**\nEnd"
+    )
+
+    elements = format_dynamic_text_to_pdf(text, generator.styles)
+
+    assert describe(elements) == [
+        ("ModernBody", "Traffic was steady<br/>across the day"),
+        ("BulletPoint", "• Lobby busiest<br/>• Peak at <b>noon</b>"),
+        ("ModernBody", "End"),
+    ]
+
+
+def test_headers_and_blank_lines_split_runs(generator):
+    text = "# Summary\nFirst  line\n\nSecond line\n## Details\n1. Numbered item"
+
+    elements = format_dynamic_text_to_pdf(text, generator.styles)
+
+    assert describe(elements) == [
+        ("SectionHeader", "Summary"),
+        ("ModernBody", "First line"),
+        ("Spacer", 6),
+        ("ModernBody", "Second line"),
+        ("Spacer", 15),
+        ("SubSectionHeader", "Details"),
+        ("BulletPoint", "• Numbered item"),
+    ]
+
+
+def test_section_spacing_pads_section_headers_and_body(generator):
+    text = "# Summary\nbody\n## Details\ntext\n### Notes\nmore"
+
+    elements = format_dynamic_text_to_pdf(text, generator.styles, section_spacing=True)
+
+    assert describe(elements) == [
+        ("SectionHeader", "Summary"),
+        ("ModernBody", "body"),
+        ("Spacer", 5),
+        ("Spacer", 15),
+        ("Spacer", 10),
+        ("SubSectionHeader", "Details"),
+        ("ModernBody", "text"),
+        ("Spacer", 5),
+        ("Spacer", 15),
+        ("Heading3", "Notes"),
+        ("ModernBody", "more"),
+        ("Spacer", 5),
+    ]
+
+
+def test_section_markers_become_headers(generator):
+    text = "1. **Overview**:\nSales rose\nA. **Detail**\n- one\n**Note**:\nend"
+
+    elements = generator.format_text_with_structure(text)
+
+    assert describe(elements) == [
+        ("Heading3", "Overview"),
+        ("ModernBody", "Sales rose"),
+        ("Spacer", 5),
+        ("Spacer", 15),
+        ("Heading4", "Detail"),
+        ("BulletPoint", "• one"),
+        ("Spacer", 15),
+        ("Heading4", "Note"),
+        ("ModernBody", "end"),
+        ("Spacer", 5),
+    ]
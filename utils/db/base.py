@@ -1,10 +1,14 @@
 # FILE: utils/db/base.py
 
 import contextlib
+from functools import lru_cache
+import hashlib
+import json
 from typing import Any, List, Dict, Union
 from datetime import datetime, timezone
 import os
 
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from loguru import logger
 from sqlalchemy import (
@@ -46,7 +50,10 @@ class Camera(Base):
 class CameraTraffic(Base):
     __tablename__ = "camera_traffic"
     id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime(timezone=True))
+    # create_all only builds this index for new tables; existing databases need
+    # CREATE INDEX IF NOT EXISTS ix_camera_traffic_timestamp
+    #     ON camera_traffic (timestamp);
+    timestamp = Column(DateTime(timezone=True), index=True)
     camera_name = Column(String(50))
     count = Column(Integer)
     location = Column(String(50))
@@ -116,11 +123,21 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+@lru_cache(maxsize=256)
+def _text_clause(query: str):
+    """Build the TextClause once per distinct SQL string.
+
+    A stable construct keeps SQLAlchemy's compiled cache warm, and the asyncpg
+    dialect then reuses its per-connection prepared statement for that SQL.
+    """
+    return text(query)
+
+
 async def execute_query(query: str, params: dict = None) -> list:
     """Execute a read-only query and return results as list of dictionaries."""
     try:
         async with async_engine.connect() as conn:
-            result = await conn.execute(text(query), params or {})
+            result = await conn.execute(_text_clause(query), params or {})
             # .mappings() is a convenient way to get dict-like rows
             return result.mappings().all()
     except Exception as e:
@@ -128,6 +145,32 @@ async def execute_query(query: str, params: dict = None) -> list:
         return []
 
 
+# Read results keyed by sha256(sql + canonical params); short TTL as traffic is live
+_QUERY_RESULT_CACHE: TTLCache = TTLCache(maxsize=256, ttl=30)
+
+
+def _query_cache_key(query: str, params: dict = None) -> bytes:
+    """Hash the SQL text together with its params in a canonical order."""
+    canonical_params = json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha256(f"{query}\0{canonical_params}".encode("utf-8")).digest()
+
+
+async def execute_cached_query(query: str, params: dict = None) -> list:
+    """Execute a read-only query, reusing the result of an identical recent call.
+
+    Callers get their own list; the rows themselves are read-only mappings.
+    """
+    cache_key = _query_cache_key(query, params)
+    cached = _QUERY_RESULT_CACHE.get(cache_key)
+    if cached is not None:
+        return list(cached)
+    result = await execute_query(query, params)
+    # execute_query returns [] on failure, so only keep non-empty results
+    if result:
+        _QUERY_RESULT_CACHE[cache_key] = list(result)
+    return result
+
+
 async def single_insert_query(db_table: Base, query_values: dict):
     """Execute an async insert query for a single row."""
     async with AsyncSessionLocal() as session:
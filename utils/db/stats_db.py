@@ -1,8 +1,9 @@
+import asyncio
 from dotenv import load_dotenv
 from loguru import logger
 from typing import Any
 from datetime import datetime
-from utils.db.base import execute_query
+from utils.db.base import execute_cached_query, execute_query
 
 # Define logger path
 logger.add("./logs/db.log", rotation="700 MB")
@@ -10,6 +11,8 @@ logger.add("./logs/db.log", rotation="700 MB")
 
 async def get_traffic_by_date(target_date: Any) -> list:
     """Get all traffic records for a specific date - optimized query"""
+    # Half-open timestamp range instead of DATE(timestamp) so the timestamp
+    # index applies; the other day filters in this module follow suit
     query = """
     SELECT 
         timestamp,
@@ -20,10 +23,11 @@ async def get_traffic_by_date(target_date: Any) -> list:
         day_of_week,
         is_holiday
     FROM camera_traffic
-    WHERE DATE(timestamp) = :target_date
+    WHERE timestamp >= CAST(:target_date AS DATE)
+    AND timestamp < CAST(:target_date AS DATE) + 1
     ORDER BY count DESC;
     """
-    return await execute_query(query, {"target_date": target_date})
+    return await execute_cached_query(query, {"target_date": target_date})
 
 
 async def get_hourly_counts_sorted(target_date: Any) -> list:
@@ -34,11 +38,12 @@ async def get_hourly_counts_sorted(target_date: Any) -> list:
         location,
         SUM(count) AS total_count
     FROM camera_traffic
-    WHERE DATE(timestamp) = :target_date
+    WHERE timestamp >= CAST(:target_date AS DATE)
+    AND timestamp < CAST(:target_date AS DATE) + 1
     GROUP BY EXTRACT(HOUR FROM timestamp), location
     ORDER BY hour, total_count DESC;
     """
-    return await execute_query(query, {"target_date": target_date.date()})
+    return await execute_cached_query(query, {"target_date": target_date.date()})
 
 
 async def get_top_locations(target_date: Any, n: int = 5) -> list:
@@ -51,7 +56,8 @@ async def get_top_locations(target_date: Any, n: int = 5) -> list:
         ROUND(AVG(count::NUMERIC), 2) AS avg_count,
         MAX(count) AS max_count
     FROM camera_traffic
-    WHERE DATE(timestamp) = :target_date
+    WHERE timestamp >= CAST(:target_date AS DATE)
+    AND timestamp < CAST(:target_date AS DATE) + 1
     GROUP BY location
     ORDER BY total_count DESC
     LIMIT :limit_n;
@@ -64,6 +70,93 @@ async def get_top_locations(target_date: Any, n: int = 5) -> list:
         return []
 
 
+# Comprehensive analytics query, specialized per top_n so LIMIT is a literal
+_TRAFFIC_ANALYTICS_TEMPLATE = """
+    WITH daily_stats AS (
+        SELECT 
+            timestamp,
+            camera_name,
+            count,
+            location,
+            direction,
+            day_of_week,
+            is_holiday,
+            EXTRACT(HOUR FROM timestamp)::INTEGER AS hour
+        FROM camera_traffic
+        WHERE timestamp >= CAST(:target_date AS DATE)
+          AND timestamp < CAST(:target_date AS DATE) + 1
+    ),
+    basic_stats AS (
+        SELECT 
+            ROUND(AVG(count::NUMERIC), 2) AS avg_count,
+            MAX(count) AS max_count,
+            SUM(count) AS total_count,
+            COUNT(*) AS record_count
+        FROM daily_stats
+    ),
+    location_direction_stats AS (
+        SELECT 
+            location,
+            direction,
+            SUM(count) AS total,
+            ROUND(AVG(count::NUMERIC), 2) AS average
+        FROM daily_stats
+        GROUP BY location, direction
+        ORDER BY total DESC
+    ),
+    hourly_stats AS (
+        SELECT 
+            hour,
+            location,
+            SUM(count) AS total_count
+        FROM daily_stats
+        GROUP BY hour, location
+        ORDER BY hour, total_count DESC
+    ),
+    top_locations AS (
+        SELECT 
+            location,
+            SUM(count) AS total_count,
+            ROUND(AVG(count::NUMERIC), 2) AS avg_count,
+            MAX(count) AS max_count
+        FROM daily_stats
+        GROUP BY location
+        ORDER BY total_count DESC
+        LIMIT {top_n}
+    )
+    SELECT 
+        'basic_stats' AS query_type,
+        json_agg(basic_stats.*) AS data
+    FROM basic_stats
+    
+    UNION ALL
+    
+    SELECT 
+        'location_direction_analysis' AS query_type,
+        json_agg(location_direction_stats.*) AS data
+    FROM location_direction_stats
+    
+    UNION ALL
+    
+    SELECT 
+        'hourly_aggregates' AS query_type,
+        json_agg(hourly_stats.*) AS data
+    FROM hourly_stats
+    
+    UNION ALL
+    
+    SELECT 
+        'top_locations' AS query_type,
+        json_agg(top_locations.*) AS data
+    FROM top_locations
+"""
+# Pre-rendered SQL for the common top_n values; the asyncpg dialect caches the
+# prepared statement per distinct SQL text on each pooled connection
+_TRAFFIC_ANALYTICS_SQL = {
+    n: _TRAFFIC_ANALYTICS_TEMPLATE.format(top_n=n) for n in (3, 5, 10, 20)
+}
+
+
 async def get_traffic_analytics(target_date: datetime, top_n: int = 5) -> dict:
     """
     Get comprehensive traffic analytics using optimized single-pass queries.
@@ -76,94 +169,17 @@ async def get_traffic_analytics(target_date: datetime, top_n: int = 5) -> dict:
     results = {}
 
     try:
-        # Single comprehensive query for multiple analytics
-        comprehensive_query = """
-        WITH daily_stats AS (
-            SELECT 
-                timestamp,
-                camera_name,
-                count,
-                location,
-                direction,
-                day_of_week,
-                is_holiday,
-                EXTRACT(HOUR FROM timestamp)::INTEGER AS hour
-            FROM camera_traffic
-            WHERE DATE(timestamp) = :target_date
-        ),
-        basic_stats AS (
-            SELECT 
-                ROUND(AVG(count::NUMERIC), 2) AS avg_count,
-                MAX(count) AS max_count,
-                SUM(count) AS total_count,
-                COUNT(*) AS record_count
-            FROM daily_stats
-        ),
-        location_direction_stats AS (
-            SELECT 
-                location,
-                direction,
-                SUM(count) AS total,
-                ROUND(AVG(count::NUMERIC), 2) AS average
-            FROM daily_stats
-            GROUP BY location, direction
-            ORDER BY total DESC
-        ),
-
-        hourly_stats AS (
-            SELECT 
-                hour,
-                location,
-                SUM(count) AS total_count
-            FROM daily_stats
-            GROUP BY hour, location
-            ORDER BY hour, total_count DESC
-        ),
-        top_locations AS (
-            SELECT 
-                location,
-                SUM(count) AS total_count,
-                ROUND(AVG(count::NUMERIC), 2) AS avg_count,
-                MAX(count) AS max_count
-            FROM daily_stats
-            GROUP BY location
-            ORDER BY total_count DESC
-            LIMIT :top_n
-        ),
-        SELECT 
-            'basic_stats' AS query_type,
-            json_agg(basic_stats.*) AS data
-        FROM basic_stats
-        
-        UNION ALL
-        
-        SELECT 
-            'location_direction_analysis' AS query_type,
-            json_agg(location_direction_stats.*) AS data
-        FROM location_direction_stats
-        
-        UNION ALL
-        
-       
-        
-        SELECT 
-            'hourly_aggregates' AS query_type,
-            json_agg(hourly_stats.*) AS data
-        FROM hourly_stats
-        
-        UNION ALL
-        
-        SELECT 
-            'top_locations' AS query_type,
-            json_agg(top_locations.*) AS data
-        FROM top_locations
-        
-   
-        """
-
-        # Execute comprehensive query
-        comprehensive_results = await execute_query(
-            comprehensive_query, {"target_date": target_date, "top_n": top_n}
+        # Literal LIMIT lets the planner pick a bounded top-N sort
+        comprehensive_query = _TRAFFIC_ANALYTICS_SQL.get(
+            top_n
+        ) or _TRAFFIC_ANALYTICS_TEMPLATE.format(top_n=int(top_n))
+
+        # Run the comprehensive query and the detailed daily data concurrently;
+        # each call checks out its own pooled connection, and a dashboard
+        # reload within the cache TTL is served without touching the database
+        comprehensive_results, daily_data = await asyncio.gather(
+            execute_cached_query(comprehensive_query, {"target_date": target_date}),
+            get_traffic_by_date(target_date),
         )
 
         # Process results into organized dictionary
@@ -176,8 +192,6 @@ async def get_traffic_analytics(target_date: datetime, top_n: int = 5) -> dict:
             else:
                 results[query_type] = data if data else []
 
-        # Get detailed daily data separately (for memory efficiency)
-        daily_data = await get_traffic_by_date(target_date)
         results["daily_traffic_data"] = daily_data if daily_data else None
 
         return results
@@ -199,13 +213,14 @@ async def get_traffic_summary(target_date: datetime) -> dict:
         ROUND(AVG(count::NUMERIC), 2) AS avg_traffic,
         MAX(count) AS peak_traffic,
         COUNT(DISTINCT location) AS unique_locations,
-        COUNT(DISTINCT camera_name) AS active_cameras,
+        COUNT(DISTINCT camera_name) AS active_cameras
     FROM camera_traffic
-    WHERE DATE(timestamp) = :target_date;
+    WHERE timestamp >= CAST(:target_date AS DATE)
+    AND timestamp < CAST(:target_date AS DATE) + 1;
     """
 
-        result = await execute_query(query, {"target_date": target_date})
-        return result[0]
+        result = await execute_cached_query(query, {"target_date": target_date})
+        return result[0] if result else {}
     except ValueError as e:
         logger.debug(f"Results misisng for the date due to {e}")
         return {}
@@ -222,13 +237,14 @@ async def get_nightly_report(target_date: datetime) -> dict:
         ROUND(AVG(count::NUMERIC), 2) AS avg_traffic,
         MAX(count) AS peak_traffic,
         COUNT(DISTINCT location) AS unique_locations,
-        COUNT(DISTINCT camera_name) AS active_cameras,
+        COUNT(DISTINCT camera_name) AS active_cameras
     FROM camera_traffic
-    WHERE DATE(timestamp) = :target_date;
+    WHERE timestamp >= CAST(:target_date AS DATE)
+    AND timestamp < CAST(:target_date AS DATE) + 1;
     """
 
-        result = await execute_query(query, {"target_date": target_date})
-        return result[0]
+        result = await execute_cached_query(query, {"target_date": target_date})
+        return result[0] if result else {}
     except ValueError as e:
         logger.debug(f"Results misisng for the date due to {e}")
         return {}
@@ -1,10 +1,29 @@
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
 from loguru import logger
 
 logger.add("./logs/holiday_checker.log", rotation="700 MB")
 
-
-def calculate_easter(year):
+# Month names indexed by dt.month - 1, avoids strftime("%B") per check
+_MONTHS = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
+
+@lru_cache(maxsize=16)
+def calculate_easter(year: int) -> date:
     """Calculates Easter date for a given year using Gauss's algorithm"""
     a = year % 19
     b = year // 100
@@ -23,72 +42,49 @@ def calculate_easter(year):
     return date(year, month, day)
 
 
-def get_kenyan_holidays(year=None):
-    """Returns all Kenyan holidays for a given year"""
-    if year is None:
-        year = date.today().year
-
+@lru_cache(maxsize=16)
+def get_holiday_dates(year: int) -> frozenset:
+    """Returns the set of Kenyan holiday dates for a given year"""
     easter = calculate_easter(year)
-
-    holidays = {
-        "January": [{"date": 1, "name": "New Year's Day"}],
-        "February": [],
-        "March": [],
-        "April": [
-            {"date": easter.day - 2, "name": "Good Friday"},
-            {"date": easter.day + 1, "name": "Easter Monday"},
-        ],
-        "May": [{"date": 1, "name": "Labour Day"}],
-        "June": [{"date": 1, "name": "Madaraka Day"}],
-        "July": [],
-        "August": [],
-        "September": [],
-        "October": [
-            {"date": 10, "name": "Huduma Day"},
-            {"date": 20, "name": "Mashujaa Day"},
-        ],
-        "November": [],
-        "December": [
-            {"date": 12, "name": "Jamhuri Day"},
-            {"date": 25, "name": "Christmas Day"},
-            {"date": 26, "name": "Boxing Day"},
-        ],
-    }
-
-    # Handle cases where Easter crosses month boundaries
-    if easter.month == 3:  # March
-        holidays["March"].extend(
-            [
-                {"date": easter.day - 2, "name": "Good Friday"},
-                {"date": easter.day + 1, "name": "Easter Monday"},
-            ]
-        )
-        holidays["April"] = []
-    elif easter.month == 4:  # April (normal case)
-        pass  # Already handled in default
-
-    return holidays
-
-
-# Yearly holidays
-current_year = date.today().year
-holidays = get_kenyan_holidays(current_year)
-
-current_time_utc = datetime.now(timezone.utc)
-formatted_time = current_time_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+    fixed = [
+        (1, 1),  # New Year's Day
+        (5, 1),  # Labour Day
+        (6, 1),  # Madaraka Day
+        (10, 10),  # Huduma Day
+        (10, 20),  # Mashujaa Day
+        (12, 12),  # Jamhuri Day
+        (12, 25),  # Christmas Day
+        (12, 26),  # Boxing Day
+    ]
+    return frozenset(
+        [date(year, month, day) for month, day in fixed]
+        + [
+            easter - timedelta(days=2),  # Good Friday
+            easter + timedelta(days=1),  # Easter Monday
+        ]
+    )
 
 
 @logger.catch()
 def holiday_checker(
-    date_string: str = formatted_time, holidays: dict = holidays
+    date_string: Optional[str] = None, holidays: Optional[dict] = None
 ) -> bool:
     """
     Convert the string datetime into actual dates and check if date is in holiday list
     """
 
-    # Parse ISO format (handles 'Z' timezone)
-    dt = datetime.fromisoformat(date_string.replace("Z", "+00:00"))
-    month = dt.strftime("%B")  # Full month name (e.g., "January")
+    # Default to the current time at call, not at import
+    if date_string is None:
+        dt = datetime.now(timezone.utc)
+    else:
+        # Parse ISO format (handles 'Z' timezone)
+        dt = datetime.fromisoformat(date_string.replace("Z", "+00:00"))
+
+    # Default to the cached holiday dates for the year being checked
+    if holidays is None:
+        return dt.date() in get_holiday_dates(dt.year)
+
+    month = _MONTHS[dt.month - 1]  # Full month name (e.g., "January")
     day = dt.day
 
     # Check if month exists in holidays
@@ -103,8 +99,8 @@ def holiday_checker(
 # Example usage:
 if __name__ == "__main__":
     # Holiday example
-    holiday_checker("2024-12-25T23:59:59Z", holidays)
+    holiday_checker("2024-12-25T23:59:59Z")
 
     # Not a holiday
-    holiday_checker"2024-01-15T09:00:00Z", holidays)
+    holiday_checker("2024-01-15T09:00:00Z")
 """
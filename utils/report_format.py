@@ -11,16 +11,84 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
 from datetime import datetime
+from functools import partial
+from io import BytesIO
 import re
+import threading
 
+__all__ = ["ModernPDFGenerator", "format_dynamic_text_to_pdf"]
 
-def format_dynamic_text_to_pdf(raw_text, styles):
+# Header (#..####, deeper levels keep the extra hashes as text) or list item
+# (•, -, * bullets, numbered, lettered); anything else is body text
+_LINE_RE = re.compile(
+    r"(?P<hashes>#{1,4})(?P<header_text>.*)"
+    r"|(?:[•\-\*]|\d+\.|[a-zA-Z]\.)\s+(?P<item>.+)"
+)
+
+# Inline markup, applied in this order by process_inline_formatting
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC_RE = re.compile(r"\*(.+?)\*")
+_UNDERLINE_RE = re.compile(r"_(.+?)_")
+_CODE_RE = re.compile(r"`(.+?)`")
+
+# Section markers rewritten into headers by format_text_with_structure:
+# "1. **Title**:" -> ###, "A. **Title**:" and "**Title**:" -> ####
+_SECTION_MARKER_RE = re.compile(
+    r"^(?:\d+\.\s*\*\*(?P<numbered>.+?)\*\*:?"
+    r"|[A-Z]\.\s*\*\*(?P<lettered>.+?)\*\*:?"
+    r"|\*\*(?P<bold>.+?)\*\*:)\s*$",
+    flags=re.MULTILINE,
+)
+_SECTION_MARKER_PREFIX = {"numbered": "### ", "lettered": "#### ", "bold": "#### "}
+
+# Emoji markers dropped from insight and recommendation bullets in one pass
+_INSIGHT_EMOJI_TABLE = str.maketrans("", "", "🏢💡")
+_RECOMMENDATION_EMOJI_TABLE = str.maketrans("", "", "💰📊")
+
+# (label, key, default) rows for the report tables, read with _rows
+_TRAFFIC_SPEC = (
+    ("Total Traffic", "total_traffic", 0),
+    ("Average Traffic", "average_traffic", 0),
+    ("Max Traffic", "max_traffic", 0),
+)
+_BUILDING_SPEC = (
+    ("Building Name", "building_name", "N/A"),
+    ("Building ID", "building_id", "N/A"),
+)
+_BUILDING_DETAILS_SPEC = (
+    ("Capacity", "capacity", "N/A"),
+    ("Total Area (sq ft)", "total_area_sqft", "N/A"),
+    ("Floors", "floors", "N/A"),
+    ("Operating Hours", "operating_hours", "N/A"),
+)
+_STATS_SPEC = (
+    ("Total Traffic", "total_traffic", 0),
+    ("Average Traffic", "average_traffic", 0),
+    ("Maximum Traffic", "max_traffic", 0),
+    ("Data Points Collected", "data_points", 0),
+)
+
+
+def _rows(source, spec):
+    """Build [label, value] table rows from a dict and a (label, key, default) spec"""
+    return [[label, str(source.get(key, default))] for label, key, default in spec]
+
+
+def _section_marker_to_header(match):
+    """Rewrite a matched section marker as a markdown header"""
+    kind = match.lastgroup
+    return _SECTION_MARKER_PREFIX[kind] + match.group(kind)
+
+
+def format_dynamic_text_to_pdf(raw_text, styles, section_spacing=False):
     """
     Convert dynamic text with markdown-like formatting to PDF elements.
 
     Args:
         raw_text (str): Raw text with \n for newlines, ### for titles, ** for bold, etc.
         styles (dict): ReportLab styles dictionary
+        section_spacing (bool): Add extra space before section headers and after
+            body paragraphs
 
     Returns:
         list: List of formatted PDF elements (Paragraphs, Spacers)
@@ -28,125 +96,189 @@ def format_dynamic_text_to_pdf(raw_text, styles):
 
     def clean_text(text):
         """Clean and normalize text"""
-        # Replace multiple spaces with single space
-        text = re.sub(r"\s+", " ", text)
-        # Strip leading/trailing whitespace
-        return text.strip()
-
-    def detect_list_item(line):
-        """Detect if line is a list item and return cleaned text"""
-        # Check for bullet points: •, -, *, numbers
-        bullet_patterns = [
-            r"^[•\-\*]\s+(.+)",  # • - * bullets
-            r"^\d+\.\s+(.+)",  # numbered lists
-            r"^[a-zA-Z]\.\s+(.+)",  # lettered lists
-        ]
-
-        for pattern in bullet_patterns:
-            match = re.match(pattern, line.strip())
-            if match:
-                return match.group(1)
-        return None
+        # Collapse whitespace runs and strip the ends in one C-level pass
+        return " ".join(text.split())
 
     def process_inline_formatting(text):
         """Process inline formatting like **bold**, *italic*, etc."""
-        # Bold text **text**
-        text = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", text)
+        # Substring checks skip the regex scan for markers that are absent
+        if "*" in text:
+            # Bold text **text**
+            if "**" in text:
+                text = _BOLD_RE.sub(r"<b>\1</b>", text)
 
-        # Italic text *text*
-        text = re.sub(r"\*(.+?)\*", r"<i>\1</i>", text)
+            # Italic text *text*
+            text = _ITALIC_RE.sub(r"<i>\1</i>", text)
 
         # Underline text _text_
-        text = re.sub(r"_(.+?)_", r"<u>\1</u>", text)
+        if "_" in text:
+            text = _UNDERLINE_RE.sub(r"<u>\1</u>", text)
 
         # Code/monospace text `code`
-        text = re.sub(r"`(.+?)`", r'<font name="Courier">\1</font>', text)
+        if "`" in text:
+            text = _CODE_RE.sub(r'<font name="Courier">\1</font>', text)
 
         return text
 
-    def get_header_level(line):
-        """Determine header level based on ### markers"""
-        if line.startswith("####"):
-            return 4, line[4:].strip()
-        elif line.startswith("###"):
-            return 3, line[3:].strip()
-        elif line.startswith("##"):
-            return 2, line[2:].strip()
-        elif line.startswith("#"):
-            return 1, line[1:].strip()
-        return 0, line
-
-    # Split text into lines and process
-    lines = raw_text.split("\n")
+    # Split text into lines and process them in a single streaming pass
+    lines = raw_text.splitlines()
     elements = []
+    # Resolve style fallbacks once rather than on every matching line
+    header_styles = (
+        None,
+        styles.get("SectionHeader", styles.get("Heading1", styles["Normal"])),
+        styles.get("SubSectionHeader", styles.get("Heading2", styles["Normal"])),
+        styles.get("Heading3", styles.get("Heading2", styles["Normal"])),
+        styles.get("Heading4", styles.get("Normal")),
+    )
+    body_style = styles.get("ModernBody", styles["Normal"])
+    bullet_style = styles.get("BulletPoint", styles["Normal"])
+    # Extra gaps, decided by style name so fallback styles are left alone
+    header_gaps = tuple(
+        section_spacing
+        and style is not None
+        and style.name in ("SectionHeader", "SubSectionHeader")
+        for style in header_styles
+    )
+    body_gap = section_spacing and body_style.name == "ModernBody"
+
+    # Consecutive body or list lines, emitted as one Paragraph per run
+    body_lines = []
+    list_lines = []
+
+    def flush_blocks():
+        """Emit buffered body and list lines, one paragraph per run"""
+        runs = ((body_lines, body_style), (list_lines, bullet_style))
+        for block_lines, style in runs:
+            if block_lines:
+                # Inline markup never spans a newline, so one pass covers the block
+                block = process_inline_formatting("\n".join(block_lines))
+                elements.append(Paragraph(block.replace("\n", "<br/>"), style))
+                if body_gap and style is body_style:
+                    elements.append(Spacer(1, 5))
+                block_lines.clear()
 
     for line in lines:
         line = line.strip()
 
         # Skip empty lines but add spacer
         if not line:
+            flush_blocks()
             elements.append(Spacer(1, 6))
             continue
 
-        # Check for headers
-        header_level, header_text = get_header_level(line)
-        if header_level > 0:
-            header_text = process_inline_formatting(clean_text(header_text))
+        # Classify the line as header, list item or body in one match
+        match = _LINE_RE.match(line)
+        if match and match.group("hashes"):
+            flush_blocks()
+            header_level = len(match.group("hashes"))
+            header_text = process_inline_formatting(
+                clean_text(match.group("header_text"))
+            )
 
             # Add spacing before headers (except first element)
             if elements:
                 elements.append(Spacer(1, 15))
 
-            # Choose appropriate style based on header level
-            if header_level == 1:
-                style = styles.get(
-                    "SectionHeader", styles.get("Heading1", styles["Normal"])
-                )
-            elif header_level == 2:
-                style = styles.get(
-                    "SubSectionHeader", styles.get("Heading2", styles["Normal"])
-                )
-            elif header_level == 3:
-                style = styles.get("Heading3", styles.get("Heading2", styles["Normal"]))
-            else:  # level 4+
-                style = styles.get("Heading4", styles.get("Normal"))
-
-            elements.append(Paragraph(header_text, style))
+            if header_gaps[header_level] and elements:
+                elements.append(Spacer(1, 10))
+
+            # _LINE_RE caps the level at 4
+            elements.append(Paragraph(header_text, header_styles[header_level]))
             continue
 
-        # Check for list items
-        list_content = detect_list_item(line)
-        if list_content:
-            list_content = process_inline_formatting(clean_text(list_content))
-            bullet_style = styles.get("BulletPoint", styles["Normal"])
-            elements.append(Paragraph(f"• {list_content}", bullet_style))
+        if match:
+            list_content = match.group("item")
+            if body_lines:
+                flush_blocks()
+            list_lines.append(f"• {clean_text(list_content)}")
             continue
 
-        # Regular paragraph
-        processed_text = process_inline_formatting(clean_text(line))
-        if processed_text:  # Only add non-empty paragraphs
-            body_style = styles.get("ModernBody", styles["Normal"])
-            elements.append(Paragraph(processed_text, body_style))
+        # Regular paragraph, formatted when the block is flushed
+        if list_lines:
+            flush_blocks()
+        body_lines.append(clean_text(line))
 
+    flush_blocks()
     return elements
 
 
 class ModernPDFGenerator:
-    def __init__(self):
-        # Modern color palette
-        self.primary_color = HexColor("#2563eb")  # Blue
-        self.secondary_color = HexColor("#64748b")  # Slate gray
-        self.accent_color = HexColor("#10b981")  # Emerald
-        self.warning_color = HexColor("#f59e0b")  # Amber
-        self.danger_color = HexColor("#ef4444")  # Red
-        self.background_color = HexColor("#f8fafc")  # Light gray
-        self.text_color = HexColor("#1e293b")  # Dark slate
+    # Modern color palette
+    primary_color = HexColor("#2563eb")  # Blue
+    secondary_color = HexColor("#64748b")  # Slate gray
+    accent_color = HexColor("#10b981")  # Emerald
+    warning_color = HexColor("#f59e0b")  # Amber
+    danger_color = HexColor("#ef4444")  # Red
+    background_color = HexColor("#f8fafc")  # Light gray
+    text_color = HexColor("#1e293b")  # Dark slate
+
+    # Table styles only reference the class palette, so build them once
+    # Key metrics dashboard
+    _metrics_table_style = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), background_color),
+            ("TEXTCOLOR", (0, 0), (-1, 0), text_color),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+            ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 11),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+            ("TOPPADDING", (0, 0), (-1, -1), 8),
+            ("GRID", (0, 0), (-1, -1), 1, secondary_color),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ]
+    )
+
+    # Building information, labels in the first column
+    _building_table_style = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (0, -1), background_color),
+            ("TEXTCOLOR", (0, 0), (-1, -1), text_color),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+            ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+            ("TOPPADDING", (0, 0), (-1, -1), 6),
+            ("GRID", (0, 0), (-1, -1), 1, secondary_color),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ]
+    )
+
+    # Traffic statistics, with a header row
+    _stats_table_style = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), primary_color),
+            ("TEXTCOLOR", (0, 0), (-1, 0), white),
+            ("BACKGROUND", (0, 1), (0, -1), background_color),
+            ("TEXTCOLOR", (0, 1), (-1, -1), text_color),
+            ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTNAME", (0, 1), (0, -1), "Helvetica-Bold"),
+            ("FONTNAME", (1, 1), (1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 11),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+            ("TOPPADDING", (0, 0), (-1, -1), 8),
+            ("GRID", (0, 0), (-1, -1), 1, secondary_color),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ]
+    )
+
+    # Stylesheet shared by every generator, built on first use
+    _styles = None
+    _styles_lock = threading.Lock()
 
+    def __init__(self):
         # Create custom styles
         self.styles = self._create_styles()
 
-    def _create_styles(self):
-        """Create modern, professional styles"""
+    @classmethod
+    def _create_styles(cls):
+        """Create modern, professional styles (built once per process)"""
+        if cls._styles is not None:
+            return cls._styles
+
         styles = getSampleStyleSheet()
 
         # Custom styles
@@ -155,7 +287,7 @@ class ModernPDFGenerator:
                 name="ModernTitle",
                 parent=styles["Title"],
                 fontSize=28,
-                textColor=self.primary_color,
+                textColor=cls.primary_color,
                 spaceAfter=30,
                 alignment=TA_LEFT,
                 fontName="Helvetica-Bold",
@@ -167,7 +299,7 @@ class ModernPDFGenerator:
                 name="ModernSubtitle",
                 parent=styles["Normal"],
                 fontSize=16,
-                textColor=self.secondary_color,
+                textColor=cls.secondary_color,
                 spaceAfter=20,
                 fontName="Helvetica",
                 alignment=TA_LEFT,
@@ -179,12 +311,12 @@ class ModernPDFGenerator:
                 name="SectionHeader",
                 parent=styles["Heading1"],
                 fontSize=18,
-                textColor=self.primary_color,
+                textColor=cls.primary_color,
                 spaceBefore=25,
                 spaceAfter=15,
                 fontName="Helvetica-Bold",
                 borderWidth=0,
-                borderColor=self.primary_color,
+                borderColor=cls.primary_color,
                 borderPadding=5,
             )
         )
@@ -194,7 +326,7 @@ class ModernPDFGenerator:
                 name="SubSectionHeader",
                 parent=styles["Heading2"],
                 fontSize=14,
-                textColor=self.text_color,
+                textColor=cls.text_color,
                 spaceBefore=15,
                 spaceAfter=10,
                 fontName="Helvetica-Bold",
@@ -206,7 +338,7 @@ class ModernPDFGenerator:
                 name="ModernBody",
                 parent=styles["Normal"],
                 fontSize=11,
-                textColor=self.text_color,
+                textColor=cls.text_color,
                 spaceAfter=8,
                 fontName="Helvetica",
                 alignment=TA_JUSTIFY,
@@ -219,7 +351,7 @@ class ModernPDFGenerator:
                 name="BulletPoint",
                 parent=styles["Normal"],
                 fontSize=11,
-                textColor=self.text_color,
+                textColor=cls.text_color,
                 spaceAfter=6,
                 fontName="Helvetica",
                 leftIndent=20,
@@ -233,7 +365,7 @@ class ModernPDFGenerator:
                 name="MetricValue",
                 parent=styles["Normal"],
                 fontSize=24,
-                textColor=self.primary_color,
+                textColor=cls.primary_color,
                 fontName="Helvetica-Bold",
                 alignment=TA_CENTER,
             )
@@ -244,16 +376,21 @@ class ModernPDFGenerator:
                 name="MetricLabel",
                 parent=styles["Normal"],
                 fontSize=10,
-                textColor=self.secondary_color,
+                textColor=cls.secondary_color,
                 fontName="Helvetica",
                 alignment=TA_CENTER,
                 spaceAfter=15,
             )
         )
 
-        return styles
+        # Racing first builds keep whichever stylesheet lands first, so every
+        # generator shares one instance even when PDFs render in worker threads
+        with cls._styles_lock:
+            if cls._styles is None:
+                cls._styles = styles
+        return cls._styles
 
-    def _create_header_footer(self, canvas, doc):
+    def _create_header_footer(self, canvas, doc, date_str):
         """Create modern header and footer"""
         canvas.saveState()
 
@@ -267,7 +404,6 @@ class ModernPDFGenerator:
 
         # Add date to header
         canvas.setFont("Helvetica", 10)
-        date_str = datetime.now().strftime("%B %d, %Y")
         canvas.drawRightString(doc.pagesize[0] - 40, doc.pagesize[1] - 32, date_str)
 
         # Footer
@@ -279,17 +415,12 @@ class ModernPDFGenerator:
 
     def _create_metrics_table(self, data):
         """Create a modern metrics dashboard"""
-        executive_summary = data.get("executive_summary", {})
-        raw_stats = data.get("raw_statistics", {})
+        executive_summary = data.get("executive_summary") or {}
+        building_info = executive_summary.get("building_info") or {}
+        raw_stats = data.get("raw_statistics") or {}
 
-        metrics_data = [
-            ["Total Traffic", str(raw_stats.get("total_traffic", 0))],
-            ["Average Traffic", str(raw_stats.get("average_traffic", 0))],
-            ["Max Traffic", str(raw_stats.get("max_traffic", 0))],
-            [
-                "Building Capacity",
-                str(executive_summary.get("building_info", {}).get("capacity", "N/A")),
-            ],
+        metrics_data = _rows(raw_stats, _TRAFFIC_SPEC) + [
+            ["Building Capacity", str(building_info.get("capacity", "N/A"))],
             ["Data Points", str(executive_summary.get("data_points_analyzed", 0))],
             [
                 "Analysis Period",
@@ -298,46 +429,29 @@ class ModernPDFGenerator:
         ]
 
         table = Table(metrics_data, colWidths=[2.5 * inch, 2 * inch])
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), self.background_color),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), self.text_color),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                    ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 11),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                    ("TOPPADDING", (0, 0), (-1, -1), 8),
-                    ("GRID", (0, 0), (-1, -1), 1, self.secondary_color),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ]
-            )
-        )
+        table.setStyle(self._metrics_table_style)
 
         return table
 
     def _create_insights_section(self, insights):
         """Create formatted insights section"""
-        elements = []
-
-        for insight in insights:
-            # Remove emoji and format text
-            clean_insight = insight.replace("🏢", "").replace("💡", "").strip()
-            elements.append(Paragraph(f"• {clean_insight}", self.styles["BulletPoint"]))
-
-        return elements
+        bullet_style = self.styles["BulletPoint"]
+        emoji = _INSIGHT_EMOJI_TABLE
+        # Remove emoji and format text
+        return [
+            Paragraph(f"• {insight.translate(emoji).strip()}", bullet_style)
+            for insight in insights
+        ]
 
     def _create_recommendations_section(self, recommendations):
         """Create formatted recommendations section"""
-        elements = []
-
-        for rec in recommendations:
-            # Remove emoji and format text
-            clean_rec = rec.replace("💰", "").replace("📊", "").strip()
-            elements.append(Paragraph(f"• {clean_rec}", self.styles["BulletPoint"]))
-
-        return elements
+        bullet_style = self.styles["BulletPoint"]
+        emoji = _RECOMMENDATION_EMOJI_TABLE
+        # Remove emoji and format text
+        return [
+            Paragraph(f"• {rec.translate(emoji).strip()}", bullet_style)
+            for rec in recommendations
+        ]
 
     def format_text_with_structure(self, raw_text):
         """
@@ -351,60 +465,23 @@ class ModernPDFGenerator:
             list: List of formatted PDF elements
         """
 
-        # Pre-process text to handle special cases
-        def preprocess_text(text):
-            # Handle numbered sections like "1. **Title**:"
-            text = re.sub(
-                r"^(\d+)\.\s*\*\*(.+?)\*\*:?\s*$", r"### \2", text, flags=re.MULTILINE
-            )
-
-            # Handle lettered sections like "A. **Title**:"
-            text = re.sub(
-                r"^([A-Z])\.\s*\*\*(.+?)\*\*:?\s*$",
-                r"#### \2",
-                text,
-                flags=re.MULTILINE,
-            )
-
-            # Handle standalone bold text as subheaders
-            text = re.sub(r"^\*\*(.+?)\*\*:\s*$", r"#### \1", text, flags=re.MULTILINE)
-
-            return text
-
-        # Preprocess the text
-        processed_text = preprocess_text(raw_text)
+        # Turn numbered, lettered and bold section markers into headers in one pass
+        processed_text = _SECTION_MARKER_RE.sub(_section_marker_to_header, raw_text)
 
-        # Use the main formatter
-        elements = format_dynamic_text_to_pdf(processed_text, self.styles)
-
-        # Post-process to add better spacing around sections
-        final_elements = []
-        for i, element in enumerate(elements):
-            # Add extra spacing before major sections
-            if (
-                hasattr(element, "style")
-                and hasattr(element.style, "name")
-                and element.style.name in ["SectionHeader", "SubSectionHeader"]
-            ):
-                if final_elements:  # Don't add space before first element
-                    final_elements.append(Spacer(1, 10))
-
-            final_elements.append(element)
-
-            # Add spacing after headers
-            if (
-                hasattr(element, "style")
-                and hasattr(element.style, "name")
-                and element.style.name == "ModernBody"
-            ):
-                final_elements.append(Spacer(1, 5))
-
-        return final_elements
+        # Section spacing is applied while the elements are emitted
+        return format_dynamic_text_to_pdf(
+            processed_text, self.styles, section_spacing=True
+        )
 
     def generate_pdf(self, data, output_filename="building_analytics_report.pdf"):
-        """Generate the complete PDF report"""
+        """Generate the complete PDF report.
+
+        output_filename may be a path or a writable file-like object; pass None
+        to render in memory and get the PDF back as bytes.
+        """
+        buffer = BytesIO() if output_filename is None else None
         doc = SimpleDocTemplate(
-            output_filename,
+            buffer or output_filename,
             pagesize=A4,
             rightMargin=40,
             leftMargin=40,
@@ -412,140 +489,97 @@ class ModernPDFGenerator:
             bottomMargin=50,
         )
 
-        story = []
+        # Build PDF with custom header/footer; the header date is fixed per report
+        header_footer = partial(
+            self._create_header_footer,
+            date_str=datetime.now().strftime("%B %d, %Y"),
+        )
+        doc.build(
+            list(self._build_story(data)),
+            onFirstPage=header_footer,
+            onLaterPages=header_footer,
+        )
 
-        # Title Section
-        executive_summary = data.get("executive_summary", {})
-        building_info = executive_summary.get("building_info", {})
+        if buffer is not None:
+            return buffer.getvalue()
+        return output_filename
 
-        story.append(
-            Paragraph(
-                f"Analytics Report: {building_info.get('building_name', 'Building Analysis')}",
-                self.styles["ModernTitle"],
-            )
+    def _build_story(self, data):
+        """Yield the report flowables in page order"""
+        # Bind the nested sections once; building_info may be None without
+        # building stats
+        executive_summary = data.get("executive_summary") or {}
+        building_info = executive_summary.get("building_info") or {}
+        raw_stats = data.get("raw_statistics") or {}
+
+        # Title Section
+        building_name = building_info.get("building_name", "Building Analysis")
+        yield Paragraph(
+            f"Analytics Report: {building_name}",
+            self.styles["ModernTitle"],
         )
 
-        story.append(
-            Paragraph(
-                f"Building ID: {building_info.get('building_id', 'N/A')} | "
-                f"Type: {building_info.get('building_type', 'N/A').title()} | "
-                f"Period: {executive_summary.get('analysis_period', 'N/A').title()}",
-                self.styles["ModernSubtitle"],
-            )
+        yield Paragraph(
+            f"Building ID: {building_info.get('building_id', 'N/A')} | "
+            f"Type: {building_info.get('building_type', 'N/A').title()} | "
+            f"Period: {executive_summary.get('analysis_period', 'N/A').title()}",
+            self.styles["ModernSubtitle"],
         )
 
-        story.append(Spacer(1, 20))
+        yield Spacer(1, 20)
 
         # Executive Summary Section
-        story.append(Paragraph("Executive Summary", self.styles["SectionHeader"]))
+        yield Paragraph("Executive Summary", self.styles["SectionHeader"])
 
         # Key Metrics Table
-        story.append(Paragraph("Key Metrics", self.styles["SubSectionHeader"]))
-        story.append(self._create_metrics_table(data))
-        story.append(Spacer(1, 20))
+        yield Paragraph("Key Metrics", self.styles["SubSectionHeader"])
+        yield self._create_metrics_table(data)
+        yield Spacer(1, 20)
 
         # Key Insights
-        story.append(Paragraph("Key Insights", self.styles["SubSectionHeader"]))
+        yield Paragraph("Key Insights", self.styles["SubSectionHeader"])
         insights = data.get("key_insights", [])
-        story.extend(self._create_insights_section(insights))
-        story.append(Spacer(1, 15))
+        yield from self._create_insights_section(insights)
+        yield Spacer(1, 15)
 
         # Recommendations
-        story.append(Paragraph("Recommendations", self.styles["SubSectionHeader"]))
+        yield Paragraph("Recommendations", self.styles["SubSectionHeader"])
         recommendations = data.get("recommendations", [])
-        story.extend(self._create_recommendations_section(recommendations))
-        story.append(Spacer(1, 20))
+        yield from self._create_recommendations_section(recommendations)
+        yield Spacer(1, 20)
 
         # Detailed Analysis Section
-        story.append(Paragraph("Detailed Analysis", self.styles["SectionHeader"]))
+        yield Paragraph("Detailed Analysis", self.styles["SectionHeader"])
 
         # Building Information
-        story.append(Paragraph("Building Information", self.styles["SubSectionHeader"]))
-
-        building_data = [
-            ["Building Name", building_info.get("building_name", "N/A")],
-            ["Building ID", building_info.get("building_id", "N/A")],
-            ["Type", building_info.get("building_type", "N/A").title()],
-            ["Capacity", str(building_info.get("capacity", "N/A"))],
-            ["Total Area (sq ft)", str(building_info.get("total_area_sqft", "N/A"))],
-            ["Floors", str(building_info.get("floors", "N/A"))],
-            ["Operating Hours", str(building_info.get("operating_hours", "N/A"))],
-        ]
+        yield Paragraph("Building Information", self.styles["SubSectionHeader"])
 
-        building_table = Table(building_data, colWidths=[2 * inch, 3 * inch])
-        building_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (0, -1), self.background_color),
-                    ("TEXTCOLOR", (0, 0), (-1, -1), self.text_color),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                    ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 10),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                    ("TOPPADDING", (0, 0), (-1, -1), 6),
-                    ("GRID", (0, 0), (-1, -1), 1, self.secondary_color),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ]
-            )
+        building_data = (
+            _rows(building_info, _BUILDING_SPEC)
+            + [["Type", building_info.get("building_type", "N/A").title()]]
+            + _rows(building_info, _BUILDING_DETAILS_SPEC)
         )
 
-        story.append(building_table)
-        story.append(Spacer(1, 20))
+        building_table = Table(building_data, colWidths=[2 * inch, 3 * inch])
+        building_table.setStyle(self._building_table_style)
+
+        yield building_table
+        yield Spacer(1, 20)
 
         # Traffic Statistics
-        story.append(Paragraph("Traffic Statistics", self.styles["SubSectionHeader"]))
-        raw_stats = data.get("raw_statistics", {})
-
-        stats_data = [
-            ["Metric", "Value"],
-            ["Total Traffic", str(raw_stats.get("total_traffic", 0))],
-            ["Average Traffic", str(raw_stats.get("average_traffic", 0))],
-            ["Maximum Traffic", str(raw_stats.get("max_traffic", 0))],
-            ["Data Points Collected", str(raw_stats.get("data_points", 0))],
-        ]
+        yield Paragraph("Traffic Statistics", self.styles["SubSectionHeader"])
+
+        stats_data = [["Metric", "Value"]] + _rows(raw_stats, _STATS_SPEC)
 
         stats_table = Table(stats_data, colWidths=[2.5 * inch, 2 * inch])
-        stats_table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), self.primary_color),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), white),
-                    ("BACKGROUND", (0, 1), (0, -1), self.background_color),
-                    ("TEXTCOLOR", (0, 1), (-1, -1), self.text_color),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTNAME", (0, 1), (0, -1), "Helvetica-Bold"),
-                    ("FONTNAME", (1, 1), (1, -1), "Helvetica"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 11),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                    ("TOPPADDING", (0, 0), (-1, -1), 8),
-                    ("GRID", (0, 0), (-1, -1), 1, self.secondary_color),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ]
-            )
-        )
+        stats_table.setStyle(self._stats_table_style)
 
-        story.append(stats_table)
-        story.append(Spacer(1, 20))
+        yield stats_table
+        yield Spacer(1, 20)
 
         # AI report
-        story.append(Paragraph("AI report", self.styles["SectionHeader"]))
+        yield Paragraph("AI report", self.styles["SectionHeader"])
         formated_llm_output = self.format_text_with_structure(
-            data.get("detailed_report")
+            data.get("detailed_report") or ""
         )
-        story.append(
-            Paragraph(
-                f"{formated_llm_output}",
-                self.styles["BulletPoint"],
-            )
-        )
-
-        # Build PDF with custom header/footer
-        doc.build(
-            story,
-            onFirstPage=self._create_header_footer,
-            onLaterPages=self._create_header_footer,
-        )
-
-        return output_filename
+        yield from formated_llm_output
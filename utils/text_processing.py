@@ -2,6 +2,31 @@
 
 import re
 
+# Patterns used by convert_llm_output_to_readable, compiled once at import
+_BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+# Dash bullets only at the start of a line (after any indent), not "9am - 5pm"
+_DASH_BULLET_RE = re.compile(r"^([ \t]*)- ", re.MULTILINE)
+# Colon spacing and blank-line runs fused into one scan
+_FIXUPS_RE = re.compile(r"(?P<colon>\s*:\s*)|(?P<blank>\n{3,})")
+_FIXUPS = {"colon": ": ", "blank": "\n\n"}
+_HEADER_RE = re.compile(r"#{1,6}\s+(.*?)(?:\n|$)")
+_WHITESPACE_RE = re.compile(r"\s+")
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def clean_text_remove_think_tags(text: str) -> str:
+    """
+    Removes <think>...</think> reasoning blocks and collapses runs of blank lines.
+    """
+    if not text:
+        return ""
+    # Most replies carry no reasoning block, so skip the DOTALL scan entirely
+    if "<think>" in text:
+        text = _THINK_RE.sub("", text)
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
 def convert_llm_output_to_readable(llm_output: str) -> str:
     """
     Converts an LLM output with markdown and formatting artifacts into clean, human-readable text.
@@ -19,11 +44,11 @@ def convert_llm_output_to_readable(llm_output: str) -> str:
         # If no <think> tags are found, use the whole text
         main_text = text.strip()
 
-    text = re.sub(r"\*\*(.*?)\*\*", r"\1", main_text)
-    text = re.sub(r"- ", "• ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"\s*:\s*", ": ", text)
-    text = re.sub(r"#{1,6}\s+(.*?)(?:\n|$)", r"\1\n", text)
+    # Most replies carry no bold markers, so skip the scan when absent
+    text = _BOLD_RE.sub(r"\1", main_text) if "**" in main_text else main_text
+    text = _DASH_BULLET_RE.sub(r"\1• ", text)
+    text = _FIXUPS_RE.sub(lambda m: _FIXUPS[m.lastgroup], text)
+    text = _HEADER_RE.sub(r"\1\n", text)
 
     paragraphs = text.split("\n\n")
     formatted_paragraphs = []
@@ -32,8 +57,8 @@ def convert_llm_output_to_readable(llm_output: str) -> str:
             if "• " in p:
                 formatted_paragraphs.append(p)
             else:
-                formatted_p = re.sub(r"\s+", " ", p)
+                formatted_p = _WHITESPACE_RE.sub(" ", p)
                 formatted_paragraphs.append(formatted_p)
 
     clean_text = "\n\n".join(formatted_paragraphs)
-    return clean_text
\ No newline at end of file
+    return clean_text
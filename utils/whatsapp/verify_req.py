@@ -6,6 +6,9 @@ from typing import Optional
 import asyncio
 # Valkey client setup (consider making this a singleton)
 valkey_client = valkey.Valkey(host='localhost', port=6379, db=0, decode_responses=True)
+# Small dedicated pool so bursts of cache writes don't queue behind other
+# work on the loop's default executor
+_CACHE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="valkey")
 
 class ValkeyStoreData(BaseModel):
     request_id: str
@@ -17,12 +20,10 @@ def init_cache(cache_data: ValkeyStoreData) -> Optional[str]:
     Returns the stored value if successful, None otherwise
     """
     try:
-        # Use pipeline for atomic operations
-        with valkey_client.pipeline() as pipe:
-            pipe.set(cache_data.request_id, cache_data.request_status)
-            pipe.get(cache_data.request_id)
-            result = pipe.execute()
-        return result[1]  # Return the get() result
+        # A successful SET stores exactly this value, so reading it back is redundant
+        if valkey_client.set(cache_data.request_id, cache_data.request_status):
+            return cache_data.request_status
+        return None
     except valkey.ValkeyError as e:
         logger.error(f"Valkey operation failed: {e}")
         return None
@@ -32,15 +33,11 @@ def init_cache(cache_data: ValkeyStoreData) -> Optional[str]:
 
 async def async_init_cache(cache_data: ValkeyStoreData) -> Optional[str]:
     """
-    Async version using thread pool executor
+    Async version running the blocking client call on the cache thread pool
     """
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     try:
-        return await loop.run_in_executor(
-            None,  # Uses default executor
-            init_cache,
-            cache_data
-        )
+        return await loop.run_in_executor(_CACHE_POOL, init_cache, cache_data)
     except Exception as e:
         logger.error(f"Async operation failed: {e}")
         return None
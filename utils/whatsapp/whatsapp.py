@@ -1,38 +1,67 @@
-import requests
-from typing import Any
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+import httpx
 from loguru import logger
-from dotenv import load_dotenv
-import os
 
-# Load the env
-load_dotenv()
+from config import settings
+
 # Logger file path
 logger.add("./logs/whatsapp.log", rotation="700 MB")
-# Configuration
-API_VERSION = "v22.0"
-PHONE_NUMBER_ID: int = int(os.getenv("PHONE_NUMBER_ID", 0))
+# Configuration, read once from the shared application settings
+API_VERSION = settings.WHATSAPP_API_VERSION
+PHONE_NUMBER_ID: int = settings.PHONE_NUMBER_ID
 
-# TODO:To be moved to secrets duting prod and when permanent Token acquired
-ACCESS_TOKEN = "EAARQrAKzcHUBPHeMdVZCZBX4yxr2bnZCdb8eY0oEbch0JsjNeSvz7qY1UWrb85ZC5B7x9sh3McJwI1gZC4BGKFpZBRMZBHHr0XoAFnI0vevJBSRuFpnPmEZAtEjvH91xXNWM8HZBuyhMZBoUOgJ8T5ZAgAMq4VCo1yKjo3nYzZCEg3ftyObzQrMjSs9LYfIRZCC2iKbZCdjyFJ2cplKzh2OnDDksKKlJZBEVgIxWtoJ0IWX8b0ZD"
+# Supplied via WHATSAPP_ACCESS_TOKEN; startup warns when it is missing
+ACCESS_TOKEN = settings.WHATSAPP_ACCESS_TOKEN
 # RECIPIENT_NUMBER = "447709769066"
 
 # TODO:Add recepient number from the message sender
 RECIPIENT_NUMBER = "+254736391323"
 
+# Async client for callers on the event loop; closed in the app lifespan
+async_http_client = httpx.AsyncClient(
+    base_url="https://graph.facebook.com",
+    headers={"Authorization": f"Bearer {ACCESS_TOKEN}"},
+    timeout=httpx.Timeout(10.0, connect=3.0),
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+)
 
-@logger.catch
-def whatsapp_messenger(llm_text_output: Any, recipient_number:str):
-    if not ACCESS_TOKEN:
-        raise ValueError("ACCESS_TOKEN is not valid")
+# Rate limits and gateway errors are retried with jittered exponential backoff.
+# A plain 500 is not, since the message may already have been accepted and a
+# resend would deliver it twice.
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+MAX_SEND_ATTEMPTS = 4
+RETRY_BACKOFF_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 30.0
 
-    url = f"https://graph.facebook.com/v22.0/{PHONE_NUMBER_ID}/messages"
 
-    headers = {
-        "Authorization": f"Bearer {ACCESS_TOKEN}",
-        "Content-Type": "application/json",
-    }
+def _retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    """Seconds to wait after a failed attempt, honouring Retry-After when sent."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            # HTTP-date form
+            try:
+                when = parsedate_to_datetime(retry_after)
+                delay = (when - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0.0), RETRY_MAX_DELAY_SECONDS)
+
+    backoff = RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+    return min(backoff + random.uniform(0, backoff), RETRY_MAX_DELAY_SECONDS)
 
-    payload = {
+
+def _text_message_payload(llm_text_output: Any, recipient_number: str) -> dict:
+    """Build the Graph API payload for a plain text message."""
+    return {
         "messaging_product": "whatsapp",
         "recipient_type": "individual",
         "to": f"{recipient_number}",
@@ -41,21 +70,50 @@ def whatsapp_messenger(llm_text_output: Any, recipient_number:str):
             "body": llm_text_output,
         },
     }
-    try:
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()  # Raises exception for HTTP errors
-
-        print(f"Status Code: {response.status_code}")
-        print("Response Headers:")
-        for header, value in response.headers.items():
-            print(f"{header}: {value}")
-        print("\nResponse Body:")
-        print(response.json())
-    except requests.exceptions.RequestException as e:
-        logger.debug(f"Error making request: {e}")
-        if hasattr(e, "response") and e.response:
-            logger.debug(f"Error details: {e.response.text}")
-
-
-# used for testing
-# whatsapp_messenger("This is the test for Lantern")
+
+
+@logger.catch
+async def whatsapp_messenger_async(llm_text_output: Any, recipient_number: str):
+    """Send a text message without blocking the event loop."""
+    if not ACCESS_TOKEN:
+        raise ValueError("ACCESS_TOKEN is not valid")
+    if not PHONE_NUMBER_ID:
+        raise ValueError("PHONE_NUMBER_ID is not set")
+
+    url = f"/{API_VERSION}/{PHONE_NUMBER_ID}/messages"
+    payload = _text_message_payload(llm_text_output, recipient_number)
+
+    for attempt in range(1, MAX_SEND_ATTEMPTS + 1):
+        try:
+            response = await async_http_client.post(url, json=payload)
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            # The request never reached the API, so a resend cannot duplicate it
+            response, failure = None, repr(e)
+        except httpx.HTTPError as e:
+            logger.error(f"WhatsApp send to {recipient_number} failed: {e!r}")
+            return
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                break
+            failure = f"HTTP {response.status_code}"
+
+        if attempt == MAX_SEND_ATTEMPTS:
+            logger.error(
+                f"WhatsApp send to {recipient_number} failed after {attempt} "
+                f"attempts: {failure}"
+            )
+            return
+        delay = _retry_delay(attempt, response)
+        logger.warning(
+            f"WhatsApp send attempt {attempt} failed ({failure}), "
+            f"retrying in {delay:.2f}s"
+        )
+        await asyncio.sleep(delay)
+
+    if response.is_error:
+        logger.error(
+            f"WhatsApp send to {recipient_number} failed: "
+            f"HTTP {response.status_code} {response.text}"
+        )
+        return
+    logger.debug(f"WhatsApp message sent: {response.status_code}")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Micro-batching of concurrent detection requests into single YOLO predict calls."""
+import asyncio
+from contextlib import suppress
+
+import numpy as np
+from loguru import logger
+
+
+class BatchedYoloWorker:
+    """Collects frames from concurrent requests and runs them through one predict"""
+
+    def __init__(self, yolo_model, predict_args: dict, max_batch: int, window: float):
+        self.model = yolo_model
+        self.predict_args = predict_args
+        self.max_batch = max_batch
+        self.window = window
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        # Nothing will serve frames still waiting in the queue
+        while not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            future.cancel()
+
+    async def submit(self, frame: np.ndarray):
+        """Queue a frame and wait for its detection result"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((frame, future))
+        return await future
+
+    async def _next_batch(self) -> list:
+        """Wait for one frame, then take whatever else arrives within the window"""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+        return batch
+
+    @staticmethod
+    def _fail(batch: list, error: BaseException):
+        """Propagate an error to every request in the batch still waiting"""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            frames = [frame for frame, _ in batch]
+            try:
+                # Off the event loop so new requests keep queueing during inference
+                results = await asyncio.to_thread(
+                    self.model.predict, frames, **self.predict_args
+                )
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Batched inference failed for {len(frames)} frames: {e}")
+                self._fail(batch, e)
+                continue
+
+            if len(results) != len(frames):
+                # Results are matched to requests by position, so none can be trusted
+                error = RuntimeError(
+                    f"Model returned {len(results)} results for {len(frames)} frames"
+                )
+                logger.error(str(error))
+                self._fail(batch, error)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                # Skip requests that were cancelled while the batch ran
+                if not future.done():
+                    future.set_result(result)
@@ -27,6 +27,20 @@ camera_line_config = [
     },  # Staff entrance
 ]
 
+# Line zone and its annotator per camera, built once so crossing state persists
+# between frames
+LINE_ZONES = {}
+for cfg in camera_line_config:
+    zone = sv.LineZone(start=cfg["START"], end=cfg["END"])
+    zone.camera_id = cfg["camera_id"]  # Store camera ID for reference
+    LINE_ZONES[cfg["camera_id"]] = (
+        zone,
+        sv.LineZoneAnnotator(thickness=4, text_thickness=4, text_scale=2),
+    )
+
+# Tracker per camera so track ids never mix between streams
+camera_trackers = defaultdict(sv.ByteTrack)
+
 # Dictionary to store counts per camera
 camera_counts = defaultdict(lambda: {"in": 0, "out": 0})
 
@@ -53,25 +67,16 @@ def callback(frame: np.ndarray, index: int, results: Any, model: Any) -> np.ndar
     return line_zone_annotator.annotate(annotated_frame, line_counter=line_zone)
 
 
-async def direction(cam_id: int, model: Any, frame: np.ndarray) -> dict:
+async def direction(cam_id: int, detections: sv.Detections) -> dict:
+    """Update a camera's line counts from detections the caller already ran"""
     try:
-        # Find the camera config
-        line_count_config = next(
-            (cfg for cfg in camera_line_config if cfg["camera_id"] == cam_id), None
-        )
-
-        if line_count_config:
-            line_zone = sv.LineZone(
-                start=line_count_config["START"], end=line_count_config["END"]
-            )
-            line_zone.camera_id = cam_id  # Store camera ID for reference
-
-            line_zone_annotator = sv.LineZoneAnnotator(
-                thickness=4, text_thickness=4, text_scale=2
-            )
-
-            results = model(frame)[0]  # Run detection
-            # annotated_frame = callback(frame, 0, results, model)
+        # Find the camera's line zone
+        line_zone, line_zone_annotator = LINE_ZONES.get(cam_id, (None, None))
+
+        if line_zone:
+            # Advance the persistent zone so its counts accumulate across frames
+            tracked = camera_trackers[cam_id].update_with_detections(detections)
+            line_zone.trigger(tracked)
 
             # Return current counts for this frame
             return {
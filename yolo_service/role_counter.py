@@ -1,26 +1,57 @@
 #!/usr/bin/env python3
 import numpy as np
-from umap import UMAP
-from sklearn.cluster import KMeans
 from tqdm import tqdm
 from transformers import AutoImageProcessor, AutoModel
 from typing import Any, Dict, List
 import torch
+import torch.nn.functional as F
 import cv2
-from collections import Counter
-from sklearn.preprocessing import StandardScaler
 import supervision as sv
 
-# Models
-IMAGE_EMBEDDING_MODEL = AutoModel.from_pretrained("facebook/dinov2-small")
-IMAGE_EMBEDDING_PROCESSOR = AutoImageProcessor.from_pretrained("facebook/dinov2-small")
+# GPU UMAP/KMeans from RAPIDS cuML when installed, CPU implementations otherwise
+try:
+    from cuml import KMeans, UMAP
+except ImportError:
+    from sklearn.cluster import KMeans
+    from umap import UMAP
+
 STRIDE = 30  # FPS
 BATCH_SIZE = 32
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# Inference-only encoder, so FP16 on GPU; CPU stays in FP32
+EMBEDDING_DTYPE = torch.float16 if DEVICE == "cuda" else torch.float32
 
-# Clustering
-REDUCER = UMAP(n_components=3)
+# Models
+IMAGE_EMBEDDING_MODEL = (
+    AutoModel.from_pretrained("facebook/dinov2-small")
+    .to(DEVICE, dtype=EMBEDDING_DTYPE)
+    .eval()
+)
+IMAGE_EMBEDDING_PROCESSOR = AutoImageProcessor.from_pretrained("facebook/dinov2-small")
+# The processor's resize/crop/normalise settings, applied with torch ops on DEVICE
+SHORTEST_EDGE = IMAGE_EMBEDDING_PROCESSOR.size["shortest_edge"]
+CROP_HEIGHT = IMAGE_EMBEDDING_PROCESSOR.crop_size["height"]
+CROP_WIDTH = IMAGE_EMBEDDING_PROCESSOR.crop_size["width"]
+PIXEL_MEAN = torch.tensor(IMAGE_EMBEDDING_PROCESSOR.image_mean, device=DEVICE).view(
+    1, 3, 1, 1
+)
+PIXEL_STD = torch.tensor(IMAGE_EMBEDDING_PROCESSOR.image_std, device=DEVICE).view(
+    1, 3, 1, 1
+)
+
+# Clustering, fitted once on a warm-up window of detections and then reused so
+# role clusters stay stable between frames
+REDUCER = UMAP(n_components=3, metric="cosine")
 CLUSTERING_MODEL = KMeans(n_clusters=5)  # 5 role types
+# OpenCV 8-bit HSV maxima for the three dominant colors, bringing the color
+# features into [0, 1] before they are normalised
+HSV_SCALE = np.tile([180.0, 255.0, 255.0], 3)
+# Norm of the color block next to the unit-length embedding, so the embedding
+# drives the cosine distance and color only refines it
+COLOR_FEATURE_WEIGHT = 0.5
+WARMUP_SAMPLES = 500
+warmup_features: List[np.ndarray] = []
+clustering_fitted = False
 
 # Color thresholds (HSV ranges) for uniform identification
 COLOR_RANGES = {
@@ -30,24 +61,95 @@ COLOR_RANGES = {
     "cleaning": ([100, 50, 50], [140, 255, 255]),  # Navy Blue
     "guest": ([0, 0, 0], [180, 255, 255]),  # Other colors
 }
+ROLE_NAMES = list(COLOR_RANGES)
+GUEST_ROLE = ROLE_NAMES.index("guest")
+# (low, high, role index) hue bands for cluster classification, listed in
+# precedence order; a cluster matching none of them is counted as guest
+HUE_BANDS = np.array(
+    [
+        (10, 20, ROLE_NAMES.index("maintenance")),
+        (20, 30, ROLE_NAMES.index("security")),
+        (200, 220, ROLE_NAMES.index("kitchen")),
+        (100, 140, ROLE_NAMES.index("cleaning")),
+    ]
+)
+
+# Dominant colors are stable under subsampling, so k-means sees at most this
+# many pixels
+MAX_COLOR_SAMPLES = 2000
+COLOR_SAMPLE_RNG = np.random.default_rng(0)
 role_counts = {"Maintenance": 0, "Security": 0, "Kitchen": 0, "Cleaning": 0, "Guest": 0}
 
 
 def extract_dominant_colors(image: np.ndarray, k: int = 3) -> List[float]:
     """Extract top-k dominant colors in HSV space"""
-    pixels = image.reshape(-1, 3)
-    pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2HSV)
+    # Convert the whole crop in one call, then flatten to one pixel per row
+    hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
+    pixels = hsv.reshape(-1, 3)
+    if pixels.shape[0] > MAX_COLOR_SAMPLES:
+        idx = COLOR_SAMPLE_RNG.choice(len(pixels), MAX_COLOR_SAMPLES, replace=False)
+        pixels = pixels[idx]
+    pixels = pixels.astype(np.float32)
 
     # Use k-means to find dominant colors
-    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 200, 0.1)
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
     _, labels, centroids = cv2.kmeans(
-        pixels.astype(np.float32), k, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS
+        pixels, k, None, criteria, 3, cv2.KMEANS_RANDOM_CENTERS
     )
 
-    # Get the most dominant colors
-    counts = Counter(labels.flatten())
-    dominant_colors = [centroids[i] for i, _ in counts.most_common(k)]
-    return np.concatenate(dominant_colors)  # Flatten to 1D array
+    # Get the most dominant colors, largest cluster first
+    counts = np.bincount(labels.ravel(), minlength=k)
+    order = np.argsort(-counts, kind="stable")
+    return centroids[order].ravel()  # Flatten to 1D array
+
+
+def preprocess_crops(crops: List[np.ndarray]) -> torch.Tensor:
+    """Resize, centre-crop and normalise crops on DEVICE like the DINOv2 processor"""
+    batch = []
+    for crop in crops:
+        x = torch.from_numpy(np.ascontiguousarray(crop)).to(DEVICE)
+        x = x.permute(2, 0, 1).unsqueeze(0).float()
+
+        # Shortest edge to SHORTEST_EDGE, keeping the aspect ratio
+        height, width = x.shape[-2:]
+        if height <= width:
+            size = (SHORTEST_EDGE, int(SHORTEST_EDGE * width / height))
+        else:
+            size = (int(SHORTEST_EDGE * height / width), SHORTEST_EDGE)
+        x = F.interpolate(
+            x, size=size, mode="bicubic", align_corners=False, antialias=True
+        )
+
+        top = (size[0] - CROP_HEIGHT) // 2
+        left = (size[1] - CROP_WIDTH) // 2
+        batch.append(x[..., top : top + CROP_HEIGHT, left : left + CROP_WIDTH])
+
+    # Bicubic can overshoot, so clamp to the pixel range before normalising
+    pixel_values = torch.cat(batch).clamp_(0, 255) / 255.0
+    return ((pixel_values - PIXEL_MEAN) / PIXEL_STD).to(EMBEDDING_DTYPE)
+
+
+def cluster_features(features: np.ndarray) -> np.ndarray:
+    """Assign each feature row to a role cluster.
+
+    The reducer and clustering model are fitted once enough detections are seen.
+    """
+    global clustering_fitted
+
+    if not clustering_fitted:
+        warmup_features.append(features)
+        if sum(len(f) for f in warmup_features) < WARMUP_SAMPLES:
+            # Too little history yet, so cluster this frame on its own
+            projections = UMAP(n_components=3, metric="cosine").fit_transform(features)
+            return KMeans(n_clusters=5).fit_predict(projections)
+
+        history = np.vstack(warmup_features)
+        warmup_features.clear()
+        CLUSTERING_MODEL.fit(REDUCER.fit_transform(history))
+        clustering_fitted = True
+
+    projections = REDUCER.transform(features)
+    return CLUSTERING_MODEL.predict(projections)
 
 
 async def person_role(yolo_results: Any) -> Dict[str, int]:
@@ -55,58 +157,60 @@ async def person_role(yolo_results: Any) -> Dict[str, int]:
     detections = sv.Detections.from_ultralytics(yolo_results)
     detections = detections.with_nms(threshold=0.5, class_agnostic=True)
 
-    # Process each detection
-    embeddings_list = []
-    color_features_list = []
-
-    for xyxy in detections.xyxy:
-        crop = sv.crop_image(yolo_results.orig_img, xyxy)
-
-        # 1. Extract DINOv2 embeddings
-        inputs = IMAGE_EMBEDDING_PROCESSOR(crop, return_tensors="pt").to(DEVICE)
-        with torch.no_grad():
-            outputs = IMAGE_EMBEDDING_MODEL(**inputs)
-        embedding = torch.mean(outputs.last_hidden_state, dim=1).cpu().numpy().flatten()
+    # Crop every detection first so the embedding model sees whole batches
+    crops = [sv.crop_image(yolo_results.orig_img, xyxy) for xyxy in detections.xyxy]
 
-        # 2. Extract dominant colors (focus on torso area)
-        torso = crop[
-            int(crop.shape[0] * 0.2) : int(crop.shape[0] * 0.8)
-        ]  # Avoid head/legs
-        color_features = extract_dominant_colors(torso)
-
-        embeddings_list.append(embedding)
-        color_features_list.append(color_features)
+    # 1. Extract DINOv2 embeddings, BATCH_SIZE crops per forward pass, written
+    # straight into one preallocated matrix
+    embeddings = np.empty(
+        (len(crops), IMAGE_EMBEDDING_MODEL.config.hidden_size), dtype=np.float32
+    )
+    for start in range(0, len(crops), BATCH_SIZE):
+        pixel_values = preprocess_crops(crops[start : start + BATCH_SIZE])
+        with torch.inference_mode():
+            outputs = IMAGE_EMBEDDING_MODEL(pixel_values=pixel_values)
+        # Pool in FP32 so the mean is not computed at half precision
+        batch_embeddings = torch.mean(outputs.last_hidden_state.float(), dim=1)
+        end = start + len(batch_embeddings)
+        embeddings[start:end] = batch_embeddings.cpu().numpy()
+
+    # 2. Extract dominant colors (focus on torso area, avoiding head/legs)
+    color_features_list = [
+        extract_dominant_colors(
+            crop[int(crop.shape[0] * 0.2) : int(crop.shape[0] * 0.8)]
+        )
+        for crop in crops
+    ]
 
     # Combine features
-    embeddings = np.array(embeddings_list)
     color_features = np.array(color_features_list)
-    features = np.hstack([embeddings, color_features])
-
-    # Normalize features
-    features = StandardScaler().fit_transform(features)
+    # Both blocks are L2-normalised per row, then the color block is weighted
+    # down, so no fitted scaler is needed
+    embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-8)
+    colors = color_features / HSV_SCALE
+    colors *= COLOR_FEATURE_WEIGHT / np.maximum(
+        np.linalg.norm(colors, axis=1, keepdims=True), 1e-8
+    )
+    features = np.hstack([embeddings, colors])
 
-    # Dimensionality reduction and clustering
-    projections = REDUCER.fit_transform(features)
-    clusters = CLUSTERING_MODEL.fit_predict(projections)
+    # Normalize, reduce and cluster
+    clusters = cluster_features(features)
 
     # Classify clusters based on color dominance
-    role_counts = {k: 0 for k in COLOR_RANGES.keys()}
-    for cluster_id in np.unique(clusters):
-        cluster_colors = color_features[clusters == cluster_id]
-        avg_hue = np.mean(cluster_colors[:, 0])  # Average Hue value
-
-        # Determine role type by color
-        if 10 <= avg_hue <= 20:
-            role_type = "maintenance"
-        elif 20 <= avg_hue <= 30:
-            role_type = "security"
-        elif 200 <= avg_hue <= 220:
-            role_type = "kitchen"
-        elif 100 <= avg_hue <= 140:
-            role_type = "cleaning"
-        else:
-            role_type = "guest"
-
-        role_counts[role_type] += np.sum(clusters == cluster_id)
+    cluster_sizes = np.bincount(clusters)
+    present = cluster_sizes > 0
+    cluster_sizes = cluster_sizes[present]
+    hue_sums = np.bincount(clusters, weights=color_features[:, 0])[present]
+    avg_hues = hue_sums / cluster_sizes  # Average Hue value per cluster
+
+    # Determine role type by color; bands are applied last-to-first so the
+    # earlier band wins where two overlap
+    roles = np.full(len(avg_hues), GUEST_ROLE)
+    for low, high, role in HUE_BANDS[::-1]:
+        roles[(avg_hues >= low) & (avg_hues <= high)] = role
+
+    counts = np.zeros(len(ROLE_NAMES), dtype=np.int64)
+    np.add.at(counts, roles, cluster_sizes)
+    role_counts = dict(zip(ROLE_NAMES, counts.tolist()))
 
     return role_counts
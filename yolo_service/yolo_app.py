@@ -1,27 +1,105 @@
 #!/usr/bin/env python3
 """Dedicated Server for web detection. Employs the YOLO model from ultralytics."""
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
+
 import cv2
 import numpy as np
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from ultralytics import YOLO
 from loguru import logger
 import supervision as sv
+import torch
+
+from batching import BatchedYoloWorker
 
 # from role_counter import person_role
 
 # Add logging for the YOLO server
 logger.add("./logs/yolo_app.log", rotation="1 week")
+# Frames arriving within this window are run through the model together
+MAX_BATCH_SIZE = 16
+BATCH_WINDOW_SECONDS = 0.01
+
 # --- Model Loading ---
+MODEL_PATH = "/app/models/yolo11l.pt"
+# TensorRT export of the same weights, built on first start on a GPU host
+ENGINE_PATH = "/app/models/yolo11l.engine"
+# Shared by warm-up and serving: the first predict call fixes the predictor's
+# precision, so warming up with different arguments would silently drop FP16
+PREDICT_ARGS = {
+    "conf": 0.6,
+    "half": True,  # FP16 on GPU, ignored on CPU
+    "verbose": False,
+    "classes": [0, 1, 2, 3],  # Detect person, bicycle, motorbike, car
+}
+
+
+def warm_up(yolo_model: YOLO):
+    """Run one predict so model loading and kernel selection happen at startup"""
+    # Landscape 16:9 frame, letterboxed to 384x640 like the camera streams
+    yolo_model.predict(np.zeros((384, 640, 3), dtype=np.uint8), **PREDICT_ARGS)
+
+
+def load_model() -> YOLO:
+    """Load and warm up the TensorRT engine when usable, else the PyTorch weights"""
+    if not os.path.exists(ENGINE_PATH) and torch.cuda.is_available():
+        try:
+            # Dynamic shapes so the batching worker's variable batch sizes fit
+            YOLO(MODEL_PATH).export(
+                format="engine",
+                half=True,
+                dynamic=True,
+                batch=MAX_BATCH_SIZE,
+                device=0,
+            )
+            logger.info(f"Exported TensorRT engine to {ENGINE_PATH}")
+        except Exception as e:
+            logger.warning(f"TensorRT export failed, using PyTorch weights: {e}")
+
+    if os.path.exists(ENGINE_PATH):
+        try:
+            engine_model = YOLO(ENGINE_PATH, task="detect")
+            # The engine is only deserialized on the first predict
+            warm_up(engine_model)
+            return engine_model
+        except Exception as e:
+            # Usually an engine built by an older TensorRT; remove it so the
+            # next start exports a fresh one
+            logger.warning(
+                f"TensorRT engine failed to load, using PyTorch weights: {e}"
+            )
+            with suppress(OSError):
+                os.remove(ENGINE_PATH)
+
+    pytorch_model = YOLO(MODEL_PATH)
+    warm_up(pytorch_model)
+    return pytorch_model
+
+
 try:
-    model = YOLO("/app/models/yolo11l.pt")
-    # Perform a dummy prediction to "warm up" the model
-    model.predict(np.zeros((640, 480, 3), dtype=np.uint8), verbose=False)
+    model = load_model()
     logger.info("YOLO model loaded and warmed up successfully.")
 except Exception as e:
     logger.error(f"Error loading YOLO model: {e}")
     raise e
 
-app = FastAPI(title="Yolo11 inference")
+
+yolo_worker = BatchedYoloWorker(
+    model, PREDICT_ARGS, max_batch=MAX_BATCH_SIZE, window=BATCH_WINDOW_SECONDS
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Starts and stops the batching worker with the app"""
+    yolo_worker.start()
+    yield
+    await yolo_worker.stop()
+
+
+app = FastAPI(title="Yolo11 inference", lifespan=lifespan)
 
 
 @app.post("/detect")
@@ -36,20 +114,17 @@ async def detect_objects(file: UploadFile = File(...)):
         contents = await file.read()
         # Convert bytes to a numpy array
         np_arr = np.frombuffer(contents, np.uint8)
-        # Decode the numpy array into an image
-        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+        # Decode the numpy array into an image, off the event loop so uploads
+        # keep decoding while the batching worker runs inference
+        frame = await asyncio.to_thread(cv2.imdecode, np_arr, cv2.IMREAD_COLOR)
 
         if frame is None:
             raise HTTPException(status_code=400, detail="Could not decode image.")
 
-        # Perform inference
-        detection_results = model.predict(
-            frame, conf=0.6, verbose=False, classes=[0, 1, 2, 3], stream=True
-        )  # Detect person, bicycle, motorbike, car
-        # Generating the annotated image/frame to be sent back
-        # Assuming clusters correspond to role types based on color
+        # Perform inference, batched with frames from other cameras
+        detection_result = await yolo_worker.submit(frame)
         return {
-            "detections": [result.to_json() for result in detection_results],
+            "detections": [detection_result.to_json()],
         }
 
     except Exception as e: